@@ -50,13 +50,14 @@ class API(api_tools.APIBase):  # pylint: disable=R0903
             ).first()
             if group is None:
                 group = ProjectGroup(name=parsed.name)
-            if group not in project.groups:
+            changed = group not in project.groups
+            if changed:
                 project.groups.append(group)
-                self.module.clear_user_projects_cache(
-                    self.module.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
-                )
 
             session.commit()
+            if changed:
+                self.module.enqueue_cache_invalidation(project_ids=[project_id])
+                self.module.drop_group_trees()
             serialized = serialize(ProjectListModel.from_orm(project))
         return serialized, 201
 
@@ -76,9 +77,8 @@ class API(api_tools.APIBase):  # pylint: disable=R0903
                 try:
                     project.groups.remove(group)
                     session.commit()
-                    self.module.clear_user_projects_cache(
-                        self.module.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
-                    )
+                    self.module.enqueue_cache_invalidation(project_ids=[project_id])
+                    self.module.drop_group_trees()
                 except ValueError:
                     pass
             else:
@@ -2,9 +2,9 @@ from flask import request
 from tools import auth, db, api_tools, serialize
 
 from pydantic.v1 import ValidationError
-from ...models.pd.group import GroupModifyModel
+from ...models.pd.group import GroupModifyModel, GroupBulkModifyModel
 from ...models.pd.project import ProjectListModel
-from ...models.project import ProjectGroup, Project
+from ...models.project import ProjectGroup, Project, decode_cursor, GROUP_CURSOR_TYPES
 
 
 class PromptLibAPI(api_tools.APIModeHandler):
@@ -23,7 +23,21 @@ class API(api_tools.APIBase):  # pylint: disable=R0903
 
     def get(self, **kwargs):
         q = request.args.get('query')
-        project_with_group = self.module.get_all_groups(name_filter=q)
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', type=int)
+        cursor = request.args.get('cursor')  # "" for the first keyset page
+        with_counts = request.args.get('counts', '').lower() in ('true', '1')
+
+        if cursor:
+            try:
+                decode_cursor(cursor, GROUP_CURSOR_TYPES)
+            except ValueError:
+                return {"error": "Invalid cursor"}, 400
+
+        project_with_group = self.module.get_all_groups(
+            name_filter=q, limit=limit, offset=offset,
+            cursor=cursor, with_counts=with_counts,
+        )
         return project_with_group, 200
 
     @auth.decorators.check_api({
@@ -33,7 +47,10 @@ class API(api_tools.APIBase):  # pylint: disable=R0903
             "default": {"admin": True, "viewer": False, "editor": True},
             "developer": {"admin": True, "viewer": False, "editor": True},
         }})
-    def put(self, project_id: int, **kwargs) -> tuple[dict, int]:
+    def put(self, project_id: int | None = None, **kwargs) -> tuple[dict, int]:
+        if project_id is None:
+            return self._put_bulk(kwargs.get('mode'))
+
         raw = dict(request.json)
         raw['project_id'] = project_id
 
@@ -63,13 +80,32 @@ class API(api_tools.APIBase):  # pylint: disable=R0903
 
             old_group_names = {g.name for g in project.groups}
             project.groups = groups
+            changed = old_group_names != set(parsed.groups)
 
             session.commit()
             serialized = serialize(ProjectListModel.from_orm(project))
 
-            if old_group_names != group_names:
-                self.module.clear_user_projects_cache(
-                    self.module.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
-                )
+            if changed:
+                self.module.enqueue_cache_invalidation(project_ids=[project_id])
+                self.module.drop_group_trees()
 
         return serialized, 200
+
+    def _put_bulk(self, mode: str | None = None) -> tuple[dict, int]:
+        """ {project_id: [group names], ...}, outside administration mode only own projects """
+        try:
+            parsed = GroupBulkModifyModel.parse_obj(request.json)
+        except ValidationError:
+            return {"error": "Can not validate data"}, 400
+
+        if mode != 'administration':
+            user_id = auth.current_user().get('id')
+            user_project_ids = {p['id'] for p in self.module.list_user_projects(user_id)}
+            forbidden = sorted(set(parsed.__root__) - user_project_ids)
+            if forbidden:
+                return {"error": "Projects can not be edited", "forbidden": forbidden}, 403
+
+        result = self.module.set_projects_groups(parsed.__root__)
+        if result["not_found"]:
+            return {"error": "Projects were not found", "not_found": result["not_found"]}, 400
+        return result, 200
@@ -1,6 +1,5 @@
-from tools import auth, db, api_tools, serialize, config as c
-
-from ...models.project import ProjectGroup, Project
+from flask import request
+from tools import auth, api_tools, serialize
 
 
 class PromptLibAPI(api_tools.APIModeHandler):
@@ -19,41 +18,12 @@ class API(api_tools.APIBase):
     def get(self, **kwargs) -> tuple[dict, int]:
         user_id = auth.current_user().get('id')
         user_projects = self.module.list_user_projects(user_id)
-        user_projects_ids = set(i['id'] for i in user_projects)
-
-        with db.get_session() as session:
-            db_groups = session.query(ProjectGroup).join(
-                ProjectGroup.projects
-            ).filter(Project.id.in_(user_projects_ids)).all()
-
-            groups = []
-            projects_with_group = set()
-
-            for g in db_groups:
-                g_projects = []
-                for p in g.projects.all():
-                    if p.id in user_projects_ids:
-                        g_projects.append({"id": p.id, "name": p.name})
-                        projects_with_group.add(p.id)
-                groups.append(
-                    dict(
-                        id=g.id,
-                        name=g.name,
-                        projects=g_projects
-                    )
-                )
-
-            not_grouped_projects_ids = user_projects_ids - projects_with_group
-            not_grouped_projects = session.query(Project).filter(Project.id.in_(not_grouped_projects_ids)).all()
-
-            no_group = dict(
-                name=c.NO_GROUP_NAME,
-                id=c.NO_GROUP_NAME,
-                projects=[{"id": p.id, "name": p.name} for p in not_grouped_projects]
-            )
-            groups.append(no_group)
-
-            return serialize({
-                'projects': [{"id": p['id'], "name": p['name']} for p in user_projects],
-                'groups': groups
-            }), 200
+        tree = self.module.get_group_tree(user_id, project_ids=[p['id'] for p in user_projects])
+        headers = {"ETag": f'"{tree["etag"]}"'}
+        if request.if_none_match.contains(tree["etag"]):
+            return "", 304, headers
+
+        return serialize({
+            'projects': [{"id": p['id'], "name": p['name']} for p in user_projects],
+            'groups': tree["groups"]
+        }), 200, headers
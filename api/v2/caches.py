@@ -0,0 +1,51 @@
+from flask import request
+
+from tools import auth, api_tools
+
+from ...utils.caches import parse_cache_limits
+
+
+class AdminAPI(api_tools.APIModeHandler):
+    @auth.decorators.check_api({
+        "permissions": ["projects.projects.caches.view"],
+        "recommended_roles": {
+            "administration": {"admin": True, "viewer": False, "editor": False},
+        }})
+    @api_tools.endpoint_metrics
+    def get(self, **kwargs) -> tuple[dict, int]:
+        return self.module.get_cache_stats(), 200
+
+    @auth.decorators.check_api({
+        "permissions": ["projects.projects.caches.edit"],
+        "recommended_roles": {
+            "administration": {"admin": True, "viewer": False, "editor": False},
+        }})
+    @api_tools.endpoint_metrics
+    def put(self, **kwargs) -> tuple[dict, int]:
+        # {"user_projects": {"maxsize": 40960, "ttl": 600}, ...}
+        data = request.json or {}
+        if not isinstance(data, dict):
+            return {"error": "Expected {cache name: {maxsize, ttl}}"}, 400
+        # everything is validated first, so a bad entry changes no cache
+        limits = {}
+        for name, values in data.items():
+            if name not in self.module.caches:
+                return {"error": f"Unknown cache: {name}"}, 400
+            try:
+                limits[name] = parse_cache_limits(values.get("maxsize"), values.get("ttl"))
+            except (TypeError, ValueError, AttributeError) as e:
+                return {"error": f"{name}: {e}"}, 400
+        return {
+            name: self.module.configure_cache(name, maxsize=maxsize, ttl=ttl)
+            for name, (maxsize, ttl) in limits.items()
+        }, 200
+
+
+class API(api_tools.APIBase):  # pylint: disable=R0903
+    url_params = [
+        "<string:mode>",
+    ]
+
+    mode_handlers = {
+        'administration': AdminAPI,
+    }
@@ -3,50 +3,24 @@ from typing import Optional, Tuple, List
 from flask import request, g
 from pylon.core.tools import log
 
-import cachetools
 from pydantic.v1 import ValidationError
 
-from tools import auth, VaultClient, db, api_tools, db_tools, rpc_tools, this, register_openapi
+from tools import auth, db, api_tools, db_tools, rpc_tools, this, register_openapi
 
-from sqlalchemy.exc import NoResultFound
 from ...models.pd.project import ProjectCreatePD
-from ...models.project import Project
+from ...models.project import Project, decode_cursor, select_fields, PROJECT_CURSOR_TYPES
+from ...models.counter import ProjectCounter
+from ...models.job import JOB_PENDING
 
-from ...utils import get_project_user
-from ...utils.project_steps import create_project, get_steps, ProjectCreateError
+from ...utils.caches import cached
+from ...utils.project_steps import create_project, create_projects_bulk, ProjectCreateError
 
 
-def delete_project(project_id: int, module) -> List[dict]:
-    with db.with_project_schema_session(None) as session:
-        project = session.query(Project).where(Project.id == project_id).first()
-        if not project:
-            return None, 404
-        try:
-            system_user_id = get_project_user(project.id)['id']
-        except (RuntimeError, KeyError, NoResultFound):
-            system_user_id = None
-
-        context = {
-            'project': project,
-            'vault_client': VaultClient.from_project(project),
-            'system_user_id': system_user_id,
-            'session': session
-        }
-
-        statuses: List[dict] = []
-        for step in get_steps(module, reverse=True):
-            try:
-                step.delete(**context)
-                session.commit()
-            except Exception as e:
-                log.warning('step exc %s %s', repr(step), e)
-            statuses.append(step.status['deleted'])
-
-        module.context.event_manager.fire_event('project_deleted', context['project'].to_json())
-        return statuses
-
-
-@cachetools.cached(cache=this.module.check_public_role_cache)
+@cached(
+    cache=this.module.check_public_role_cache,
+    key=lambda user_id: (user_id,),
+    refresher=this.module.cache_refresher,
+)
 def filter_for_check_public_role(user_id):
     check_public_project_allowed = None
     rpc_timeout = rpc_tools.RpcMixin().rpc.timeout
@@ -68,7 +42,7 @@ def filter_for_check_public_role(user_id):
     return check_public_project_allowed
 
 
-def do_project_list(user_id, offset_, limit_, search_, check_public_role, module):
+def do_project_list(user_id, offset_, limit_, search_, check_public_role, module, fields_=None):
     projects = module.list_user_projects(
         user_id, offset_=offset_, limit_=limit_, search_=search_
     )
@@ -78,7 +52,7 @@ def do_project_list(user_id, offset_, limit_, search_, check_public_role, module
         if check_public_project_allowed:
             projects = list(filter(check_public_project_allowed, projects))
 
-    return projects
+    return select_fields(projects, fields_)
 
 
 class ProjectAPI(api_tools.APIModeHandler):
@@ -104,8 +78,9 @@ class ProjectAPI(api_tools.APIModeHandler):
         search_ = request.args.get("search")
         #
         check_public_role = request.args.get("check_public_role")
+        fields_ = request.args.get("fields")  # e.g. fields=id,name
 
-        projects = do_project_list(user_id, offset_, limit_, search_, check_public_role, self.module)
+        projects = do_project_list(user_id, offset_, limit_, search_, check_public_role, self.module, fields_)
         return projects, 200
 
 
@@ -124,9 +99,17 @@ class AdminAPI(api_tools.APIModeHandler):
         offset_ = request.args.get("offset")
         limit_ = request.args.get("limit")
         search_ = request.args.get("search")
+        cursor_ = request.args.get("cursor")  # "" for the first keyset page
+        fields_ = request.args.get("fields")
+        #
+        if cursor_:
+            try:
+                decode_cursor(cursor_, PROJECT_CURSOR_TYPES)
+            except ValueError:
+                return {"error": "Invalid cursor"}, 400
         #
         return self.module.list_user_projects(
-            user_id, offset_=offset_, limit_=limit_, search_=search_
+            user_id, offset_=offset_, limit_=limit_, search_=search_, cursor_=cursor_, fields_=fields_
         ), 200
 
     @auth.decorators.check_api({
@@ -140,11 +123,18 @@ class AdminAPI(api_tools.APIModeHandler):
     def post(self, **kwargs) -> tuple[dict, int]:
         # Validate incoming data
         status_code = 201
+        if isinstance(request.json, list):
+            return self._post_bulk()
         try:
             project_model = ProjectCreatePD.parse_obj(request.json)
         except ValidationError as e:
             return e.errors(), 400
 
+        # ?async=true: provision on the worker pool, poll provisioning/administration/<job_id>
+        if request.args.get('async', '').lower() in ('true', '1'):
+            job_id = self.module.submit_provisioning_job(project_model, g.auth.id, ['admin', ])
+            return {'job_id': job_id, 'status': JOB_PENDING}, 202
+
         # steps = list(get_steps(self.module))
         context = {
             'project_model': project_model,
@@ -168,6 +158,16 @@ class AdminAPI(api_tools.APIModeHandler):
         rollback_steps: List[dict] = [step.status['deleted'] for step in rollback_progress]
         return {'steps': statuses, 'rollback_steps': rollback_steps}, status_code
 
+    def _post_bulk(self) -> tuple[dict, int]:
+        """ [ProjectCreatePD, ...] in one batch, per project statuses """
+        try:
+            project_models = [ProjectCreatePD.parse_obj(i) for i in request.json]
+        except ValidationError as e:
+            return e.errors(), 400
+        results = create_projects_bulk(self.module, project_models, g.auth.id, ['admin', ])
+        status_code = 201 if all(i['ok'] for i in results) else 207
+        return {'projects': results}, status_code
+
     @auth.decorators.check_api({
         "permissions": ["projects.projects.project.edit"],
         "recommended_roles": {
@@ -181,15 +181,31 @@ class AdminAPI(api_tools.APIModeHandler):
         data = request.json
         if not project_id:
             return {"message": "Specify project id"}, 400
-        project = Project.query.get_or_404(project_id)
+        with db.with_project_schema_session(None) as session:
+            project = session.get(Project, project_id)
+            if project is None:
+                return {"message": "Project not found"}, 404
+            if data["name"]:
+                # counters change in the same transaction as the name
+                old_name = project.name
+                project.name = data["name"]
+                session.flush()
+                ProjectCounter.project_renamed(session, old_name, data["name"])
+            if data["owner"]:
+                project.owner = data["owner"]
+            if data["plugins"]:
+                project.plugins = data["plugins"]
+            session.commit()
+            result = project.to_json(exclude_fields=Project.API_EXCLUDE_FIELDS)
         if data["name"]:
-            project.name = data["name"]
-        if data["owner"]:
-            project.owner = data["owner"]
+            self.module.drop_group_trees()
         if data["plugins"]:
-            project.plugins = data["plugins"]
-        project.commit()
-        return project.to_json(exclude_fields=Project.API_EXCLUDE_FIELDS), 200
+            try:
+                self.module.ensure_project_resources(project_id)
+            except ProjectCreateError:
+                # left skipped, retried when a plugin asks for its resources
+                log.warning('Resources of project %s plugins are not provisioned', project_id)
+        return result, 200
 
     @auth.decorators.check_api({
         "permissions": ["projects.projects.project.delete"],
@@ -201,11 +217,13 @@ class AdminAPI(api_tools.APIModeHandler):
     @api_tools.endpoint_metrics
     def delete(self, project_id: int):
         user_ids = self.module.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
+        job = self.module.schedule_project_deletion(project_id)
+        if job is None:
+            return None, 404
         self.module.context.event_manager.fire_event(
             "delete_project", {'project_id': project_id, 'user_ids': user_ids},
         )
-        statuses = delete_project(project_id=project_id, module=self.module)
-        return {'steps': statuses}, 200
+        return job, 202
 
 
 class API(api_tools.APIBase):  # pylint: disable=R0903
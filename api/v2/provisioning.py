@@ -0,0 +1,26 @@
+from tools import auth, api_tools
+
+
+class AdminAPI(api_tools.APIModeHandler):
+    @auth.decorators.check_api({
+        "permissions": ["projects.projects.project.create"],
+        "recommended_roles": {
+            "administration": {"admin": True, "viewer": False, "editor": False},
+            "default": {"admin": False, "viewer": False, "editor": False},
+            "developer": {"admin": False, "viewer": False, "editor": False},
+        }})
+    def get(self, job_id: int, **kwargs) -> tuple[dict, int]:
+        job = self.module.get_provisioning_job(job_id)
+        if job is None:
+            return {"error": "Job was not found"}, 404
+        return job, 200
+
+
+class API(api_tools.APIBase):  # pylint: disable=R0903
+    url_params = [
+        "<string:mode>/<int:job_id>",
+    ]
+
+    mode_handlers = {
+        'administration': AdminAPI,
+    }
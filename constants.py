@@ -11,3 +11,4 @@ PROJECT_SCHEMA_TEMPLATE = 'p_{}'
 PROJECT_RABBIT_USER_TEMPLATE = 'rabbit_user_{}'
 PROJECT_RABBIT_VHOST_TEMPLATE = 'project_{}_vhost'
 PROJECT_PERSONAL_NAME_TEMPLATE = 'project_user_{user_id}'
+PROJECT_WARM_POOL_NAME_TEMPLATE = 'project_pool_{uid}'
@@ -1,4 +1,7 @@
 from pylon.core.tools import web, log
+from tools import db
+
+from ..models.membership import ProjectUserMembership
 
 
 class Event:
@@ -10,20 +13,23 @@ class Event:
     @web.event(f"delete_project")
     def delete_project(self, context, event, payload):
         project_id, user_ids = payload.get('project_id'), payload.get('user_ids')
-        self.clear_user_projects_cache(
-            user_ids
-        )
+        with db.with_project_schema_session(None) as session:
+            ProjectUserMembership.remove(session, project_id)
+            session.commit()
+        self.enqueue_cache_invalidation(user_ids=user_ids)
 
     @web.event(f"user_added_to_project")
     def user_added_to_project(self, context, event, payload):
         project_id, user_ids = payload.get('project_id'), payload.get('user_ids')
-        self.clear_user_projects_cache(
-            user_ids
-        )
+        with db.with_project_schema_session(None) as session:
+            ProjectUserMembership.add(session, project_id, user_ids)
+            session.commit()
+        self.enqueue_cache_invalidation(user_ids=user_ids)
 
     @web.event(f"user_removed_from_project")
     def user_removed_from_project(self, context, event, payload):
         project_id, user_ids = payload.get('project_id'), payload.get('user_ids')
-        self.clear_user_projects_cache(
-            user_ids
-        )
+        with db.with_project_schema_session(None) as session:
+            ProjectUserMembership.remove(session, project_id, user_ids or [])
+            session.commit()
+        self.enqueue_cache_invalidation(user_ids=user_ids)
@@ -1,3 +1,7 @@
+from pylon.core.tools import log
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
 from tools import db
 
 
@@ -5,8 +9,33 @@ def init_db():
     from .models.project import Project
     from .models.project import ProjectGroup
     from .models.project import ProjectGroupAssociation
+    from .models.project import PROJECT_INDEXES
+    from .models.membership import ProjectUserMembership
+    from .models.counter import ProjectCounter
+    from .models.job import ProvisioningJob
+    from .models.warm_pool import ProjectWarmPool
+    from .models.skipped_step import ProjectSkippedStep
+    from .models.tombstone import ProjectTombstone
+    from .models.checkpoint import ProjectStepCheckpoint
     from .models.quota import ProjectQuota
     from .models.statistics import Statistic
 
+    # pg_trgm backs the name search indexes
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as e:
+        log.warning("pg_trgm extension is not available, search will not be indexed: %s", e)
+
     db.get_shared_metadata().create_all(bind=db.engine)
 
+    for index in PROJECT_INDEXES:
+        try:
+            index.create(bind=db.engine, checkfirst=True)
+        except SQLAlchemyError as e:
+            log.warning("Index %s was not created: %s", index.name, e)
+
+    # tab counters hold real totals before the first create/delete adjusts them
+    with db.with_project_schema_session(None) as session:
+        ProjectCounter.ensure_tab_counts(session)
+        session.commit()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import threading
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+
+from tools import db  # pylint: disable=E0401
+
+from ..models.membership import ProjectUserMembership
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def cache_invalidation(self):
+        """ Method """
+        self.invalidation_thread = threading.Thread(
+            target=self.invalidation_queue.run,
+            args=(self.context.stop_event,),
+            daemon=True,
+        )
+        self.invalidation_thread.start()
+
+    @web.method()
+    def enqueue_cache_invalidation(self, user_ids=None, project_ids=None):
+        """ Method """
+        self.invalidation_queue.enqueue(user_ids=user_ids, project_ids=project_ids)
+
+    @web.method()
+    def resolve_project_users(self, project_ids):
+        """ Method """
+        if self.membership_index_ready:
+            with db.with_project_schema_session(None) as session:
+                return ProjectUserMembership.get_user_ids(session, project_ids)
+        #
+        user_ids = set()
+        for project_id in project_ids:
+            user_ids.update(
+                self.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
+            )
+        return user_ids
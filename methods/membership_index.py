@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import threading
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+
+from tools import db  # pylint: disable=E0401
+
+from ..models.counter import ProjectCounter, MEMBERSHIP_INDEX_BUILT
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def membership_index(self):
+        """ Method """
+        with db.with_project_schema_session(None) as session:
+            # a partial index (crashed or running rebuild) has no marker
+            self.membership_index_ready = bool(ProjectCounter.get(session, MEMBERSHIP_INDEX_BUILT))
+        #
+        if self.membership_index_ready:
+            return
+        #
+        self.membership_index_thread = threading.Thread(
+            target=self.membership_index_builder,
+            daemon=True,
+        )
+        self.membership_index_thread.start()
+
+    @web.method()
+    def membership_index_builder(self):
+        """ Method """
+        log.info("Building project membership index")
+        #
+        try:
+            self.rebuild_membership_index()
+        except:  # pylint: disable=W0702
+            log.exception("Failed to build project membership index")
@@ -20,13 +20,12 @@
 import queue
 import threading
 
-import cachetools  # pylint: disable=E0401
-
 from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
 from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
 
 from ..constants import PROJECT_USER_NAME_PREFIX
 from ..rpc.poc import create_personal_project
+from ..utils.caches import UserIndexedTTLCache
 
 
 class Method:  # pylint: disable=E1101,R0903,W0201
@@ -45,7 +44,10 @@ class Method:  # pylint: disable=E1101,R0903,W0201
         self.visitors_queue = queue.SimpleQueue()
         self.visitors_queue_get_timeout = 1
         #
-        self.visitors_cache = cachetools.TTLCache(maxsize=20480, ttl=300)
+        self.visitors_cache = UserIndexedTTLCache(
+            maxsize=20480, ttl=300, user_getter=lambda key: key,
+        )
+        self.caches["visitors"] = self.visitors_cache
         #
         self.visitors_processor_thread = threading.Thread(
             target=self.visitors_processor,
@@ -76,10 +78,12 @@ class Method:  # pylint: disable=E1101,R0903,W0201
         #
         user_id = visitor["id"]
         #
-        with self.projects_lock:
+        with self.visitors_cache.lock:
             if user_id in self.visitors_cache:
+                self.visitors_cache.record_lookup(True)
                 return
             #
+            self.visitors_cache.record_lookup(False)
             self.visitors_cache[user_id] = visitor
         #
         if visitor.get("type", "") == "token":
@@ -96,7 +100,7 @@ class Method:  # pylint: disable=E1101,R0903,W0201
         #
         project_created = False
         #
-        with self.projects_lock:
+        with self.personal_project_locks(user_id):
             log.info("Creating private project for user ID (if not exists): %s", user_id)
             #
             if create_personal_project(user_id=user_id, module=self) is True:
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import threading
+from datetime import datetime, timedelta
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+from sqlalchemy import select  # pylint: disable=E0401
+
+from tools import db  # pylint: disable=E0401
+
+from ..models.counter import ProjectCounter
+from ..models.job import ProvisioningJob, JOB_KIND_DELETE, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from ..models.project import Project
+from ..models.tombstone import ProjectTombstone
+from ..models.warm_pool import ProjectWarmPool
+from ..utils.project_steps import ProjectModel, delete_project_steps, project_delete_context
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def project_gc(self):
+        """ Method """
+        self.project_gc_thread = threading.Thread(
+            target=self.project_gc_worker,
+            daemon=True,
+        )
+        self.project_gc_thread.start()
+
+    @web.method()
+    def project_gc_worker(self):
+        """ Method """
+        while not self.context.stop_event.is_set():
+            try:
+                while self.collect_deleted_projects() and not self.context.stop_event.is_set():
+                    pass
+            except:  # pylint: disable=W0702
+                log.exception("Failed to collect deleted projects")
+            #
+            self.project_gc_event.wait(self.project_gc_interval)
+            self.project_gc_event.clear()
+
+    @web.method()
+    def schedule_project_deletion(self, project_id: int) -> dict | None:
+        """ Method """
+        with db.with_project_schema_session(None) as session:
+            # columns only: the joined groups load would put FOR UPDATE on an outer join
+            project = session.execute(
+                select(Project.id, Project.name).where(Project.id == project_id).with_for_update()
+            ).first()
+            if project is None:
+                return None
+            tombstone = session.get(ProjectTombstone, project_id)
+            if tombstone is None:
+                job_id = ProvisioningJob.create(
+                    session, request={"project_id": project_id}, kind=JOB_KIND_DELETE,
+                    project_id=project_id, commit=False,
+                )
+                ProjectTombstone.add(session, project_id, job_id)
+                if session.get(ProjectWarmPool, project_id) is None:
+                    # pooled projects already left the counters when they were pooled
+                    session.flush()
+                    ProjectCounter.project_removed(session, project.name)
+            else:
+                job_id = tombstone.job_id
+                if tombstone.next_attempt_at is None:
+                    # repeated request retries a deletion that ran out of attempts
+                    tombstone.attempts = 0
+                    tombstone.next_attempt_at = datetime.utcnow()
+            session.commit()
+        #
+        self.project_gc_event.set()
+        return self.get_provisioning_job(job_id)
+
+    @web.method()
+    def collect_deleted_projects(self) -> int:
+        """ Method """
+        with db.with_project_schema_session(None) as session:
+            due = ProjectTombstone.claim_due(session, self.project_gc_batch, self.project_gc_lease)
+        #
+        for future in [self.project_gc_pool.submit(self.collect_deleted_project, *i) for i in due]:
+            future.result()
+        return len(due)
+
+    @web.method()
+    def collect_deleted_project(self, project_id: int, job_id: int, attempts: int, done_steps: list):
+        """ Method """
+        statuses = {
+            name: {'initialized': True, 'ok': True, 'msg': '', 'step': name} for name in done_steps
+        }
+
+        def on_progress(step_statuses):
+            statuses.update((i['step'], dict(i)) for i in step_statuses)
+            self.save_provisioning_job(job_id, steps=list(statuses.values()))
+
+        self.save_provisioning_job(job_id, status=JOB_RUNNING, error=None)
+        try:
+            with db.with_project_schema_session(None) as session:
+                project = session.get(Project, project_id)
+                if project is None:
+                    self.save_provisioning_job(job_id, status=JOB_SUCCEEDED)
+                    return
+                context = project_delete_context(session, project)
+                context['tombstone'] = True
+                on_progress(delete_project_steps(
+                    self, context, exclude=[*done_steps, ProjectModel.name], on_progress=on_progress,
+                ))
+                failed = [i for i in statuses.values() if not i['ok']]
+                if failed:
+                    raise RuntimeError("; ".join(f"{i['step']}: {i['msg']}" for i in failed))
+                # project row goes last, a failed attempt still has it to retry with
+                project_json = project.to_json()
+                model_step = ProjectModel(self)
+                try:
+                    model_step.delete(**context)
+                finally:
+                    on_progress([model_step.status['deleted']])
+        except Exception as e:  # pylint: disable=W0703
+            log.warning("Deletion of project %s failed: %s", project_id, e)
+            self.reschedule_project_deletion(
+                project_id, job_id, attempts + 1,
+                [name for name, i in statuses.items() if i['ok']], str(e),
+            )
+            return
+        #
+        self.save_provisioning_job(job_id, status=JOB_SUCCEEDED)
+        self.context.event_manager.fire_event('project_deleted', project_json)
+        log.info("Project %s deleted", project_id)
+
+    @web.method()
+    def reschedule_project_deletion(self, project_id: int, job_id: int, attempts: int, done_steps: list, error: str):
+        """ Method """
+        if attempts >= self.project_gc_max_attempts:
+            next_attempt_at, status = None, JOB_FAILED
+        else:
+            delay = min(self.project_gc_retry_delay * 2 ** (attempts - 1), self.project_gc_lease.total_seconds())
+            next_attempt_at, status = datetime.utcnow() + timedelta(seconds=delay), JOB_PENDING
+        with db.with_project_schema_session(None) as session:
+            ProjectTombstone.reschedule(session, project_id, attempts, done_steps, next_attempt_at)
+        self.save_provisioning_job(job_id, status=status, error=error)
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import json
+from datetime import datetime, timedelta
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+
+from tools import db  # pylint: disable=E0401
+
+from ..models.job import ProvisioningJob, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from ..models.pd.project import ProjectCreatePD
+from ..utils.project_steps import create_project, provision_skipped_steps, ProjectCreateError
+
+
+def step_statuses(steps: list, status: str) -> list[dict]:
+    return [dict(step.status[status]) for step in steps]
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def provisioning_jobs(self):
+        """ Method """
+        timeout = self.descriptor.config.get("provisioning_job_timeout", 3600)
+        with db.with_project_schema_session(None) as session:
+            failed = ProvisioningJob.fail_stale(
+                session, datetime.utcnow() - timedelta(seconds=timeout), "Provisioning was interrupted",
+            )
+        if failed:
+            log.warning("Marked %s stale provisioning jobs as failed", failed)
+
+    @web.method()
+    def submit_provisioning_job(self, project_model: ProjectCreatePD, owner_id: int, roles: list) -> int:
+        """ Method """
+        with db.with_project_schema_session(None) as session:
+            job_id = ProvisioningJob.create(
+                session, request=json.loads(project_model.json()), owner_id=owner_id,
+            )
+        self.provisioning_pool.submit(self.run_provisioning_job, job_id, project_model, owner_id, roles)
+        return job_id
+
+    @web.method()
+    def save_provisioning_job(self, job_id: int, **values):
+        """ Method """
+        with db.with_project_schema_session(None) as session:
+            ProvisioningJob.update(session, job_id, **values)
+
+    @web.method()
+    def run_provisioning_job(self, job_id: int, project_model: ProjectCreatePD, owner_id: int, roles: list):
+        """ Method """
+        context = {
+            'project_model': project_model,
+            'owner_id': owner_id,
+            'roles': roles,
+        }
+        result = {}
+
+        def on_progress(progress, rollback_progress):
+            if 'project' in context and 'project_id' not in result:
+                result['project_id'] = context['project'].id
+            self.save_provisioning_job(
+                job_id,
+                steps=step_statuses(progress, 'created'),
+                rollback_steps=step_statuses(rollback_progress, 'deleted'),
+                **result,
+            )
+
+        self.save_provisioning_job(job_id, status=JOB_RUNNING)
+        try:
+            progress = create_project(self, context, on_progress=on_progress)
+        except ProjectCreateError as e:
+            errors = [step.status['created']['msg'] for step in e.progress if step.status['created']['ok'] is False]
+            self.save_provisioning_job(
+                job_id, status=JOB_FAILED, error="; ".join(errors) or "Project creation failed",
+                project_id=None if e.rollback_progress else result.get('project_id'),
+                steps=step_statuses(e.progress, 'created'),
+                rollback_steps=step_statuses(e.rollback_progress, 'deleted'),
+            )
+            return
+        except Exception as e:  # pylint: disable=W0703
+            log.exception('provisioning job %s', job_id)
+            self.save_provisioning_job(job_id, status=JOB_FAILED, error=str(e))
+            return
+        self.save_provisioning_job(
+            job_id, status=JOB_SUCCEEDED, steps=step_statuses(progress, 'created'), **result,
+        )
+
+    @web.method()
+    def ensure_project_resources(self, project_id: int, plugins: list | None = None) -> list[dict]:
+        """ Method """
+        return provision_skipped_steps(self, project_id, plugins)
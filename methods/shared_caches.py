@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import threading
+
+import redis  # pylint: disable=E0401
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+
+from tools import constants, db  # pylint: disable=E0401
+
+from ..models.counter import ProjectCounter, GROUPS_VERSION
+from ..utils.caches import RedisCacheTier, CacheInvalidationBus
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def shared_caches(self):
+        """ Method """
+        if not self.descriptor.config.get("shared_caches_enabled", False):
+            return
+        #
+        client = redis.Redis(
+            host=constants.REDIS_HOST, port=constants.REDIS_PORT,
+            db=self.descriptor.config.get("shared_caches_redis_db", constants.REDIS_RABBIT_DB),
+            password=constants.REDIS_PASSWORD, username=constants.REDIS_USER
+        )
+        #
+        self.user_projects_cache.l2 = RedisCacheTier(
+            client, "user_projects",
+            ttl=self.user_projects_cache.ttl,
+            user_getter=self.user_projects_cache.user_getter,
+        )
+        self.cache_bus = CacheInvalidationBus(client, caches=self.caches)
+        #
+        self.cache_bus_thread = threading.Thread(
+            target=self.cache_bus.listen,
+            args=(self.context.stop_event,),
+            daemon=True,
+        )
+        self.cache_bus_thread.start()
+        log.info("Shared user caches enabled")
+
+    @web.method()
+    def broadcast_cache_invalidation(self, cache_name, user_ids):
+        """ Method """
+        if self.cache_bus is not None:
+            self.cache_bus.publish(cache_name, user_ids)
+
+    @web.method()
+    def broadcast_cache_clear(self, cache_name):
+        """ Method """
+        if self.cache_bus is not None:
+            self.cache_bus.publish_clear(cache_name)
+
+    @web.method()
+    def drop_group_trees(self):
+        """ Method """
+        # clear bumps the cache epoch, trees computed before it are not stored
+        self.group_tree_cache.clear()
+        self.broadcast_cache_clear("group_tree")
+        # nodes without the bus key their trees on the shared version instead
+        with db.get_session() as session:
+            ProjectCounter.bump(session, GROUPS_VERSION)
+            session.commit()
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# coding=utf-8
+
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Method """
+
+import threading
+import uuid
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401,W0611
+from pylon.core.tools import web  # pylint: disable=E0611,E0401,W0611
+from sqlalchemy import select, update  # pylint: disable=E0401
+
+from tools import db  # pylint: disable=E0401
+
+from ..constants import PROJECT_WARM_POOL_NAME_TEMPLATE
+from ..models.counter import ProjectCounter
+from ..models.pd.project import ProjectCreatePD
+from ..models.project import Project
+from ..models.warm_pool import ProjectWarmPool
+from ..utils.project_steps import create_project
+
+
+class Method:  # pylint: disable=E1101,R0903,W0201
+    """
+        Method Resource
+
+        self is pointing to current Module instance
+
+        web.method decorator takes zero or one argument: method name
+        Note: web.method decorator must be the last decorator (at top)
+    """
+
+    @web.init()
+    def warm_pool(self):
+        """ Method """
+        if self.warm_pool_size <= 0:
+            return
+        #
+        self.warm_pool_thread = threading.Thread(
+            target=self.warm_pool_filler,
+            daemon=True,
+        )
+        self.warm_pool_thread.start()
+
+    @web.method()
+    def warm_pool_filler(self):
+        """ Method """
+        log.info("Warm pool filler started, target size: %s", self.warm_pool_size)
+        #
+        while not self.context.stop_event.is_set():
+            try:
+                self.refill_warm_pool()
+            except:  # pylint: disable=W0702
+                log.exception("Failed to refill project warm pool")
+            #
+            self.warm_pool_event.wait(self.warm_pool_check_interval)
+            self.warm_pool_event.clear()
+
+    @web.method()
+    def refill_warm_pool(self):
+        """ Method """
+        with db.with_project_schema_session(None) as lock_session:
+            if not ProjectWarmPool.try_lock_refill(lock_session):
+                return  # another node is refilling
+            # nobody else provisions pool projects while the lock is held, so these were interrupted
+            for project_id in ProjectWarmPool.unfinished(lock_session):
+                log.warning("Deleting unfinished warm pool project %s", project_id)
+                self.schedule_project_deletion(project_id)
+            #
+            while not self.context.stop_event.is_set():
+                with db.with_project_schema_session(None) as session:
+                    if ProjectWarmPool.size(session) >= self.warm_pool_size:
+                        return
+                #
+                name = PROJECT_WARM_POOL_NAME_TEMPLATE.format(uid=uuid.uuid4().hex)
+                context = {
+                    'project_model': ProjectCreatePD(name=name, plugins=self.warm_pool_plugins),
+                    'owner_id': self.warm_pool_owner_id,
+                    'roles': [],
+                    'warm_pool': True,
+                }
+                create_project(self, context)
+                log.info("Warm pool project %s provisioned", name)
+
+    @web.method()
+    def claim_warm_project(self, user_id, project_name, plugins, roles):
+        """ Method """
+        if self.warm_pool_size <= 0 or sorted(plugins) != sorted(self.warm_pool_plugins):
+            return None
+        #
+        with db.with_project_schema_session(None) as session:
+            project_id = ProjectWarmPool.claim(session)
+            if project_id is None:
+                log.info("Warm pool is empty, provisioning %s from scratch", project_name)
+                return None
+            pool_name, pool_owner_id = session.execute(
+                select(Project.name, Project.owner_id).where(Project.id == project_id)
+            ).one()
+            session.execute(
+                update(Project).where(Project.id == project_id).values(name=project_name, owner_id=user_id)
+            )
+            ProjectCounter.project_added(session, project_name)
+            session.commit()
+        #
+        self.warm_pool_event.set()
+        #
+        try:
+            self.context.rpc_manager.call.admin_add_user_to_project(project_id, user_id, list(roles))
+        except:  # pylint: disable=W0702
+            # give the project back, so the caller can fall back to a full creation
+            with db.with_project_schema_session(None) as session:
+                session.execute(
+                    update(Project).where(Project.id == project_id).values(name=pool_name, owner_id=pool_owner_id)
+                )
+                ProjectWarmPool.add(session, project_id)
+                session.flush()
+                ProjectCounter.project_removed(session, project_name)
+                session.commit()
+            raise
+        return project_id
@@ -0,0 +1,57 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from tools import db, config as c
+
+
+class ProjectStepCheckpoint(db.Base):
+    """ Creation step finished for a project, data is what the step needs to restore its results """
+    __tablename__ = "project_step_checkpoint"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    project_id = Column(
+        Integer,
+        ForeignKey(f'{c.POSTGRES_SCHEMA}.project.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    step = Column(String(64), primary_key=True)
+    data = Column(JSON, nullable=False, default=dict)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def save(session, project_id: int, step: str, data: dict) -> None:
+        stmt = insert(ProjectStepCheckpoint).values(
+            project_id=project_id, step=step, data=data, created_at=datetime.utcnow(),
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[ProjectStepCheckpoint.project_id, ProjectStepCheckpoint.step],
+            set_={"data": stmt.excluded.data, "created_at": stmt.excluded.created_at},
+        ))
+
+    @staticmethod
+    def get(session, project_id: int) -> dict[str, dict]:
+        """ step name -> checkpoint data """
+        return dict(session.execute(
+            select(ProjectStepCheckpoint.step, ProjectStepCheckpoint.data).where(
+                ProjectStepCheckpoint.project_id == project_id
+            )
+        ).all())
+
+    @staticmethod
+    def clear(session, project_id: int) -> None:
+        session.execute(delete(ProjectStepCheckpoint).where(ProjectStepCheckpoint.project_id == project_id))
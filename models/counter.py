@@ -0,0 +1,161 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import re
+
+from sqlalchemy import Column, Integer, String, case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from tools import db, config as c
+
+from .project import Project
+
+PERSONAL_TAB = "personal"
+TEAM_TAB = "team"
+TAB_COUNTERS = (PERSONAL_TAB, TEAM_TAB)
+# 1 once a membership index rebuild went through every project
+MEMBERSHIP_INDEX_BUILT = "membership_index_built"
+# Bumped whenever group trees are dropped, read by nodes without the invalidation bus
+GROUPS_VERSION = "groups_version"
+
+# Python side of Project.name LIKE 'project_user_%' ("_" matches any character)
+_PERSONAL_NAME_RE = re.compile(r"project.user.", re.DOTALL)
+
+
+def is_personal_name(name: str) -> bool:
+    return bool(_PERSONAL_NAME_RE.match(name or ""))
+
+
+def project_tab(name: str) -> str:
+    return PERSONAL_TAB if is_personal_name(name) else TEAM_TAB
+
+
+class ProjectCounter(db.Base):
+    """ Maintained aggregates, e.g. personal/team project totals for list tabs """
+    __tablename__ = "project_counter"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    name = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def increment(session, name: str, amount: int = 1) -> None:
+        result = session.execute(
+            update(ProjectCounter).where(
+                ProjectCounter.name == name
+            ).values(value=ProjectCounter.value + amount)
+        )
+        if result.rowcount == 0:
+            raise RuntimeError(f"Project counter {name} is not initialized")
+
+    @staticmethod
+    def get(session, name: str, default: int = 0) -> int:
+        value = session.execute(select(ProjectCounter.value).where(ProjectCounter.name == name)).scalar()
+        return default if value is None else value
+
+    @staticmethod
+    def set(session, name: str, value: int) -> None:
+        stmt = insert(ProjectCounter).values(name=name, value=value)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[ProjectCounter.name],
+            set_={"value": value},
+        ))
+
+    @staticmethod
+    def bump(session, name: str) -> None:
+        stmt = insert(ProjectCounter).values(name=name, value=1)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[ProjectCounter.name],
+            set_={"value": ProjectCounter.value + 1},
+        ))
+
+    @staticmethod
+    def ensure_tab_counts(session) -> bool:
+        """
+            Recount when a tab counter row is missing, True if it did: the recount already
+            reflects changes flushed in session, so callers skip their increments
+        """
+        present = session.execute(
+            select(func.count()).select_from(ProjectCounter).where(ProjectCounter.name.in_(TAB_COUNTERS))
+        ).scalar()
+        if present == len(TAB_COUNTERS):
+            return False
+        ProjectCounter.recount(session)
+        return True
+
+    @staticmethod
+    def project_added(session, project_name: str) -> None:
+        """ Call once the project row is added to session, as for all changes below """
+        if ProjectCounter.ensure_tab_counts(session):
+            return
+        ProjectCounter.increment(session, project_tab(project_name), 1)
+
+    @staticmethod
+    def projects_added(session, project_names: list[str]) -> None:
+        if ProjectCounter.ensure_tab_counts(session):
+            return
+        amounts = {}
+        for name in project_names:
+            tab = project_tab(name)
+            amounts[tab] = amounts.get(tab, 0) + 1
+        for tab, amount in amounts.items():
+            ProjectCounter.increment(session, tab, amount)
+
+    @staticmethod
+    def project_removed(session, project_name: str) -> None:
+        """ Call after the project is deleted, pooled or tombstoned in session """
+        if ProjectCounter.ensure_tab_counts(session):
+            return
+        ProjectCounter.increment(session, project_tab(project_name), -1)
+
+    @staticmethod
+    def project_renamed(session, old_name: str, new_name: str) -> None:
+        if project_tab(old_name) == project_tab(new_name) or ProjectCounter.ensure_tab_counts(session):
+            return
+        ProjectCounter.increment(session, project_tab(old_name), -1)
+        ProjectCounter.increment(session, project_tab(new_name), 1)
+
+    @staticmethod
+    def recount(session) -> dict:
+        """ Rebuild tab counters from the project table, pooled and deleting projects are not counted """
+        from .warm_pool import ProjectWarmPool
+        from .tombstone import ProjectTombstone
+        is_personal = Project.name.like("project_user_%")
+        row = session.execute(select(
+            func.count().label("total"),
+            func.sum(case((is_personal, 1), else_=0)).label("personal"),
+        ).select_from(Project).where(ProjectWarmPool.not_pooled(), ProjectTombstone.not_deleted())).one()
+        counts = {
+            PERSONAL_TAB: int(row.personal or 0),
+            TEAM_TAB: int(row.total) - int(row.personal or 0),
+        }
+        for name, value in counts.items():
+            stmt = insert(ProjectCounter).values(name=name, value=value)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProjectCounter.name],
+                set_={"value": value},
+            )
+            session.execute(stmt)
+        return counts
+
+    @staticmethod
+    def get_tab_counts(session) -> dict:
+        rows = dict(session.execute(
+            select(ProjectCounter.name, ProjectCounter.value).where(
+                ProjectCounter.name.in_(TAB_COUNTERS)
+            )
+        ).all())
+        if len(rows) < len(TAB_COUNTERS):
+            rows = ProjectCounter.recount(session)
+            session.commit()
+        return {name: int(rows[name]) for name in TAB_COUNTERS}
@@ -0,0 +1,99 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Integer, JSON, String, Text, update
+
+from tools import db, config as c
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINISHED = (JOB_SUCCEEDED, JOB_FAILED)
+
+JOB_KIND_CREATE = "create"
+JOB_KIND_DELETE = "delete"
+
+
+class ProvisioningJob(db.Base):
+    """ Background project provisioning or deletion, steps hold status['created'] / status['deleted'] dicts """
+    __tablename__ = "project_provisioning_job"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False, default=JOB_KIND_CREATE)
+    status = Column(String(32), nullable=False, default=JOB_PENDING)
+    owner_id = Column(Integer, nullable=True)
+    project_id = Column(Integer, nullable=True)
+    request = Column(JSON, nullable=False, default=dict)
+    steps = Column(JSON, nullable=False, default=list)
+    rollback_steps = Column(JSON, nullable=False, default=list)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "owner_id": self.owner_id,
+            "project_id": self.project_id,
+            "steps": self.steps,
+            "rollback_steps": self.rollback_steps,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @staticmethod
+    def create(session, request: dict, owner_id: Optional[int] = None, kind: str = JOB_KIND_CREATE,
+               project_id: Optional[int] = None, commit: bool = True) -> int:
+        job = ProvisioningJob(
+            kind=kind, owner_id=owner_id, project_id=project_id, request=request, steps=[], rollback_steps=[],
+        )
+        session.add(job)
+        if commit:
+            session.commit()
+        else:
+            session.flush()
+        return job.id
+
+    @staticmethod
+    def get(session, job_id: int) -> Optional[dict]:
+        job = session.get(ProvisioningJob, job_id)
+        return job.to_dict() if job else None
+
+    @staticmethod
+    def update(session, job_id: int, **values) -> None:
+        values["updated_at"] = datetime.utcnow()
+        session.execute(
+            update(ProvisioningJob).where(ProvisioningJob.id == job_id).values(**values)
+        )
+        session.commit()
+
+    @staticmethod
+    def fail_stale(session, older_than: datetime, error: str, kind: str = JOB_KIND_CREATE) -> int:
+        """ Unfinished jobs without progress since older_than lost their worker, mark them failed """
+        result = session.execute(
+            update(ProvisioningJob).where(
+                ProvisioningJob.kind == kind,
+                ProvisioningJob.status.not_in(JOB_FINISHED),
+                ProvisioningJob.updated_at < older_than,
+            ).values(status=JOB_FAILED, error=error, updated_at=datetime.utcnow())
+        )
+        session.commit()
+        return result.rowcount
@@ -0,0 +1,69 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from typing import Iterable, List
+
+from sqlalchemy import Column, Integer, ForeignKey, Index, delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from tools import db, config as c
+
+
+class ProjectUserMembership(db.Base):
+    """ Local user -> project index, mirrors admin plugin memberships """
+    __tablename__ = "project_user_membership"
+    __table_args__ = (
+        Index('ix_project_user_membership_project_id', 'project_id'),
+        {"schema": c.POSTGRES_SCHEMA},
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    project_id = Column(
+        Integer,
+        ForeignKey(f'{c.POSTGRES_SCHEMA}.project.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+
+    @staticmethod
+    def add(session, project_id: int, user_ids: Iterable[int]) -> None:
+        values = [{'user_id': i, 'project_id': project_id} for i in set(user_ids or [])]
+        if not values:
+            return
+        stmt = insert(ProjectUserMembership).values(values).on_conflict_do_nothing()
+        session.execute(stmt)
+
+    @staticmethod
+    def remove(session, project_id: int, user_ids: Iterable[int] | None = None) -> None:
+        stmt = delete(ProjectUserMembership).where(ProjectUserMembership.project_id == project_id)
+        if user_ids is not None:
+            stmt = stmt.where(ProjectUserMembership.user_id.in_(set(user_ids)))
+        session.execute(stmt)
+
+    @staticmethod
+    def replace(session, project_id: int, user_ids: Iterable[int]) -> None:
+        ProjectUserMembership.remove(session, project_id)
+        ProjectUserMembership.add(session, project_id, user_ids)
+
+    @staticmethod
+    def get_project_ids(session, user_id: int) -> List[int]:
+        stmt = select(ProjectUserMembership.project_id).where(
+            ProjectUserMembership.user_id == user_id
+        ).order_by(ProjectUserMembership.project_id)
+        return list(session.scalars(stmt).all())
+
+    @staticmethod
+    def get_user_ids(session, project_ids: Iterable[int]) -> List[int]:
+        stmt = select(ProjectUserMembership.user_id).where(
+            ProjectUserMembership.project_id.in_(set(project_ids))
+        ).distinct()
+        return list(session.scalars(stmt).all())
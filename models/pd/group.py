@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic.v1 import BaseModel, validator
 
@@ -8,6 +8,16 @@ class GroupModifyModel(BaseModel):
     project_id: int
 
 
+class GroupBulkModifyModel(BaseModel):
+    __root__: Dict[int, List[str]]
+
+    @validator('__root__')
+    def check_no_group_name(cls, value: Dict[int, List[str]]):
+        for names in value.values():
+            assert 'no_group' not in names, 'Group with name "no_group" can not be assigned'
+        return value
+
+
 class GroupListModel(BaseModel):
     id: int
     name: str
@@ -11,16 +11,45 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+import base64
+import json
 from typing import Optional, List
 
 from ..models.pd.project import ProjectListModel
-from sqlalchemy import String, Column, Integer, JSON, ARRAY, Text, Boolean, ForeignKey, Table, asc, desc, func, case, cast, or_
+from sqlalchemy import String, Column, Integer, JSON, ARRAY, Text, Boolean, ForeignKey, Table, Index, asc, desc, func, case, or_, tuple_
 from sqlalchemy.ext.mutable import MutableDict
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 
 from tools import rpc_tools, db, db_tools, MinioClient, config as c
 
-from sqlalchemy.orm import Mapped, relationship, joinedload
+from sqlalchemy.orm import Mapped, relationship
+
+
+# Sort keys of id-ordered project cursors and name-ordered group cursors
+PROJECT_CURSOR_TYPES = (int,)
+GROUP_CURSOR_TYPES = (str, int)
+
+
+def encode_cursor(values: list) -> str:
+    """ Opaque keyset cursor: last row (sort_key, id) """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """ types are the python types of the sort key columns the cursor was made for """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    for value, type_ in zip(values, types):
+        if type_ is float and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        if not isinstance(value, type_) or (isinstance(value, bool) and type_ is not bool):
+            raise ValueError("Invalid cursor")
+    return values
 
 
 class ProjectGroup(db.Base):
@@ -37,6 +66,94 @@ class ProjectGroup(db.Base):
         overlaps="groups,project_group_association"
     )
 
+    @staticmethod
+    def set_project_groups(session, project_groups: dict[int, list[str]]) -> set[int]:
+        """
+            Replace groups of many projects at once, missing groups are created
+
+            Only the association diff is written, caller commits; returns ids of changed projects
+        """
+        wanted_names = {name for names in project_groups.values() for name in names}
+        if wanted_names:
+            session.execute(
+                insert(ProjectGroup).values(
+                    [{"name": name} for name in wanted_names]
+                ).on_conflict_do_nothing(index_elements=["name"])
+            )
+        group_ids = dict(session.execute(
+            select(ProjectGroup.name, ProjectGroup.id).where(ProjectGroup.name.in_(wanted_names))
+        ).all())
+        #
+        wanted = {
+            (project_id, group_ids[name])
+            for project_id, names in project_groups.items() for name in names
+        }
+        current = set(session.execute(
+            select(ProjectGroupAssociation.c.project_id, ProjectGroupAssociation.c.group_id).where(
+                ProjectGroupAssociation.c.project_id.in_(project_groups.keys())
+            )
+        ).all())
+        to_delete = current - wanted
+        to_insert = wanted - current
+        #
+        if to_delete:
+            session.execute(
+                ProjectGroupAssociation.delete().where(
+                    tuple_(
+                        ProjectGroupAssociation.c.project_id, ProjectGroupAssociation.c.group_id
+                    ).in_(to_delete)
+                )
+            )
+        if to_insert:
+            session.execute(
+                ProjectGroupAssociation.insert(),
+                [{"project_id": p, "group_id": g} for p, g in to_insert],
+            )
+        return {p for p, _ in to_delete | to_insert}
+
+    @staticmethod
+    def list_groups(search: Optional[str] = None,
+                    limit: Optional[int] = None, offset: Optional[int] = None,
+                    cursor: Optional[str] = None,
+                    with_counts: bool = False) -> dict | list[dict]:
+        """
+            Group catalog ordered by name, search is a name substring (pg_trgm index backed)
+
+            cursor switches to keyset pagination: pass "" for the first page,
+            then next_cursor of the previous page; result is {"rows", "next_cursor"}
+            with_counts adds projects_count of every group
+        """
+        columns = [ProjectGroup.id, ProjectGroup.name]
+        if with_counts:
+            columns.append(
+                select(func.count()).select_from(ProjectGroupAssociation).where(
+                    ProjectGroupAssociation.c.group_id == ProjectGroup.id
+                ).scalar_subquery().label("projects_count")
+            )
+        stmt = select(*columns).order_by(ProjectGroup.name, ProjectGroup.id)
+        if search:
+            stmt = stmt.where(ProjectGroup.name.ilike(f"%{search.strip()}%"))
+        with db.with_project_schema_session(None) as session:
+            if cursor is None:
+                stmt = stmt.limit(limit).offset(offset)
+                return [dict(row._mapping) for row in session.execute(stmt)]
+
+            if cursor:
+                stmt = stmt.where(
+                    tuple_(ProjectGroup.name, ProjectGroup.id) > tuple_(*decode_cursor(cursor, GROUP_CURSOR_TYPES))
+                )
+            if limit is not None:
+                stmt = stmt.limit(int(limit) + 1)
+            rows = [dict(row._mapping) for row in session.execute(stmt)]
+            next_cursor = None
+            if limit is not None and len(rows) > int(limit):
+                rows = rows[:int(limit)]
+                next_cursor = encode_cursor([rows[-1]["name"], rows[-1]["id"]])
+            return {
+                "rows": rows,
+                "next_cursor": next_cursor,
+            }
+
 
 ProjectGroupAssociation = Table(
     'project_group_association',
@@ -86,30 +203,79 @@ class Project(db_tools.AbstractBaseMixin, rpc_tools.RpcMixin, db.Base):
     def list_projects(project_id: int = None, search_: str = None,
                       limit_: int = None, offset_: int = None,
                       filter_: Optional[dict] = None,
+                      cursor_: Optional[str] = None,
+                      rank_: bool = False,
+                      fields_: Optional[list | str] = None,
                       **kwargs) -> dict | list[dict] | None:
+        """
+            cursor_ switches to keyset pagination: pass "" for the first page,
+            then next_cursor of the previous page; result is {"rows", "next_cursor"}
+
+            rank_ orders search_ results by similarity (offset pagination only)
+            fields_ limits output to a subset of ProjectListModel fields
+        """
         flt = []
         if filter_ is not None:
             for k, v in filter_.items():
                 attr = getattr(Project, k)
                 if attr:
                     flt.append(attr == v)
+        from .tombstone import ProjectTombstone
+        columns = project_list_columns(fields_)
         with db.with_project_schema_session(None) as session:
             if project_id:
-                stmt = select(Project).where(Project.id == project_id)
-                p = session.scalars(stmt).unique().first()
-                if not p:
+                stmt = select(*columns).where(Project.id == project_id)
+                row = session.execute(stmt).first()
+                if not row:
                     return
 
-                return ProjectListModel.from_orm(p).dict()
+                return dict(row._mapping)
             elif search_:
-                stmt = select(Project).where(Project.name.ilike(f"%{search_}%")).limit(limit_).offset(offset_)
+                stmt = select(*columns).where(project_search_condition(search_))
             else:
-                stmt = select(Project).where(*flt).limit(limit_).offset(offset_)
+                stmt = select(*columns).where(*flt)
+            stmt = stmt.where(ProjectTombstone.not_deleted())
 
-            stmt = stmt.order_by(asc(Project.id))
+            if search_ and rank_ and cursor_ is None:
+                stmt = stmt.order_by(desc(project_search_rank(search_)), asc(Project.id))
+            else:
+                stmt = stmt.order_by(asc(Project.id))
+
+            if cursor_ is None:
+                stmt = stmt.limit(limit_).offset(offset_)
+                return [dict(row._mapping) for row in session.execute(stmt)]
 
-            projects = session.scalars(stmt.options(joinedload(Project.groups))).unique().all()
-            return [ProjectListModel.from_orm(project).dict() for project in projects]
+            if cursor_:
+                stmt = stmt.where(Project.id > decode_cursor(cursor_, PROJECT_CURSOR_TYPES)[0])
+            if limit_ is not None:
+                stmt = stmt.limit(int(limit_) + 1)
+            rows = [dict(row._mapping) for row in session.execute(stmt)]
+            next_cursor = None
+            if limit_ is not None and len(rows) > int(limit_):
+                rows = rows[:int(limit_)]
+                next_cursor = encode_cursor([rows[-1]["id"]])
+            return {
+                "rows": rows,
+                "next_cursor": next_cursor,
+            }
+
+    @staticmethod
+    def list_user_projects(user_id: int, search_: str = None,
+                           limit_: int = None, offset_: int = None,
+                           fields_: Optional[list | str] = None,
+                           **kwargs) -> list[dict]:
+        """List projects of a user through the local membership index."""
+        from .membership import ProjectUserMembership
+        from .tombstone import ProjectTombstone
+        with db.with_project_schema_session(None) as session:
+            stmt = select(*project_list_columns(fields_)).join(
+                ProjectUserMembership, ProjectUserMembership.project_id == Project.id
+            ).where(ProjectUserMembership.user_id == user_id, ProjectTombstone.not_deleted())
+            if search_:
+                stmt = stmt.where(project_search_condition(search_))
+            stmt = stmt.order_by(asc(Project.id)).limit(limit_).offset(offset_)
+            #
+            return [dict(row._mapping) for row in session.execute(stmt)]
 
     @staticmethod
     def list_projects_paginated(
@@ -120,75 +286,233 @@ class Project(db_tools.AbstractBaseMixin, rpc_tools.RpcMixin, db.Base):
         sort_order: str = "asc",
         project_type: str = None,
         owner_ids: list = None,
+        cursor: str = None,
+        with_total: bool = True,
+        fields: Optional[list | str] = None,
     ) -> dict:
-        """List projects with DB-level pagination, filtering, sorting, and tab counts."""
+        """List projects with DB-level pagination, filtering, sorting, and tab counts.
+
+        Pass next_cursor of the previous page as cursor to page by keyset instead of offset.
+        with_total=False skips the filtered total when it is not known from tab counters.
+        """
+        from .counter import ProjectCounter, PERSONAL_TAB, TEAM_TAB
+        from .warm_pool import ProjectWarmPool
+        from .tombstone import ProjectTombstone
         with db.with_project_schema_session(None) as session:
-            # Tab counts (unfiltered by search/project_type)
-            is_personal = Project.name.like("project_user_%")
-            counts_stmt = select(
-                func.count().label("total"),
-                func.sum(case((is_personal, 1), else_=0)).label("personal"),
-            ).select_from(Project)
-            counts_row = session.execute(counts_stmt).one()
-            personal_count = int(counts_row.personal or 0)
-            team_count = int(counts_row.total) - personal_count
+            # Tab counts (unfiltered by search/project_type), maintained on create/delete
+            tab_counts = ProjectCounter.get_tab_counts(session)
+            personal_count = tab_counts[PERSONAL_TAB]
+            team_count = tab_counts[TEAM_TAB]
             #
             # Build filtered query
             #
-            conditions = []
+            is_personal = Project.name.like("project_user_%")
+            conditions = [ProjectWarmPool.not_pooled(), ProjectTombstone.not_deleted()]
             if project_type == "personal":
                 conditions.append(is_personal)
             elif project_type == "team":
                 conditions.append(~is_personal)
             if search:
-                search_conditions = [
-                    Project.name.ilike(f"%{search}%"),
-                    cast(Project.id, String).ilike(f"%{search}%"),
-                ]
+                search_conditions = [project_search_condition(search)]
                 if owner_ids:
                     search_conditions.append(Project.owner_id.in_(owner_ids))
                 conditions.append(or_(*search_conditions))
             elif owner_ids:
                 conditions.append(Project.owner_id.in_(owner_ids))
             #
-            stmt = select(Project).where(*conditions) if conditions else select(Project)
-            #
-            # Count after filtering (for pagination total)
+            # Total after filtering: tab counters when only project_type is applied,
+            # otherwise a window count over the page query
             #
-            count_stmt = select(func.count()).select_from(Project)
-            if conditions:
-                count_stmt = count_stmt.where(*conditions)
-            total = session.execute(count_stmt).scalar()
+            total = None
+            if not search and not owner_ids:
+                if project_type == "personal":
+                    total = personal_count
+                elif project_type == "team":
+                    total = team_count
+                else:
+                    total = personal_count + team_count
+            windowed_total = with_total and total is None and not cursor
             #
             # Sorting
             #
-            sort_map = {
-                "name": Project.name,
-                "id": Project.id,
-                "create_success": Project.create_success,
-                "status": case(
-                    (Project.suspended == True, 3),
-                    (Project.create_success == True, 0),
-                    (Project.create_success == False, 2),
-                    else_=1,
-                ),
-            }
-            sort_col = sort_map.get(sort_by, Project.name)
-            order_fn = desc if sort_order.lower() == "desc" else asc
-            stmt = stmt.order_by(order_fn(sort_col))
+            if sort_by == "relevance" and search:
+                sort_col = project_search_rank(search)
+                sort_type = float
+            else:
+                sort_col = PROJECT_SORT_MAP.get(sort_by, Project.name)
+                sort_type = PROJECT_SORT_TYPES.get(sort_by, str)
+            is_desc = sort_order.lower() == "desc"
+            order_fn = desc if is_desc else asc
+            # id breaks ties, so (sort_key, id) is unique and usable as a keyset
+            columns = [*project_list_columns(fields), sort_col.label("sort_key")]
+            if windowed_total:
+                columns.append(func.count().over().label("total"))
+            stmt = select(*columns).where(*conditions)
+            stmt = stmt.order_by(order_fn(sort_col), order_fn(Project.id))
             #
             # Pagination
             #
-            stmt = stmt.limit(limit).offset(offset)
-            stmt = stmt.options(joinedload(Project.groups))
-            projects = session.scalars(stmt).unique().all()
-            rows = [ProjectListModel.from_orm(p).dict() for p in projects]
+            if cursor:
+                after = tuple_(sort_col, Project.id)
+                last = tuple_(*decode_cursor(cursor, (sort_type, int)))
+                stmt = stmt.where(after < last if is_desc else after > last)
+            else:
+                stmt = stmt.offset(offset)
+            if limit is not None:
+                # one row past the page tells whether there is a next one
+                limit = int(limit)
+                stmt = stmt.limit(limit + 1)
+            result = session.execute(stmt).all()
+            next_cursor = None
+            if limit is not None and len(result) > limit:
+                result = result[:limit]
+                next_cursor = encode_cursor([result[-1].sort_key, result[-1].id])
+            service_columns = {"sort_key", "total"}
+            rows = [
+                {k: v for k, v in r._mapping.items() if k not in service_columns}
+                for r in result
+            ]
+            #
+            if windowed_total and result:
+                total = result[0].total
+            elif with_total and total is None:
+                # Cursor pages and pages past the end carry no window total
+                count_stmt = select(func.count()).select_from(Project).where(*conditions)
+                total = session.execute(count_stmt).scalar()
             #
             return {
                 "rows": rows,
                 "total": total,
+                "next_cursor": next_cursor,
                 "counts": {
                     "personal": personal_count,
                     "team": team_count,
                 },
             }
+
+
+PROJECT_LIST_FIELDS = tuple(ProjectListModel.__fields__)
+
+
+def project_groups_column():
+    """ Groups of a project as a JSON list of {id, name}, one correlated subquery """
+    group = func.json_build_object('id', ProjectGroup.id, 'name', ProjectGroup.name)
+    return select(
+        func.coalesce(func.json_agg(aggregate_order_by(group, ProjectGroup.id)), text("'[]'::json"))
+    ).select_from(
+        ProjectGroupAssociation.join(ProjectGroup, ProjectGroupAssociation.c.group_id == ProjectGroup.id)
+    ).where(
+        ProjectGroupAssociation.c.project_id == Project.id
+    ).scalar_subquery()
+
+
+def project_list_columns(fields: Optional[list | str] = None) -> list:
+    """
+        Columns for ProjectListModel-shaped rows, selected without ORM objects
+
+        fields is a list or comma separated string of ProjectListModel fields, id is always present
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    if fields:
+        wanted = {f.strip() for f in fields} | {"id"}
+        fields = [f for f in PROJECT_LIST_FIELDS if f in wanted]
+    else:
+        fields = PROJECT_LIST_FIELDS
+    return [
+        project_groups_column().label(f) if f == "groups" else getattr(Project, f).label(f)
+        for f in fields
+    ]
+
+
+def select_fields(rows: list[dict], fields: Optional[list | str] = None) -> list[dict]:
+    """ In-memory counterpart of project_list_columns for already loaded rows """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    if not fields:
+        return rows
+    wanted = {f.strip() for f in fields} | {"id"}
+    return [{k: v for k, v in row.items() if k in wanted} for row in rows]
+
+
+def project_search_condition(search: str):
+    """ Name substring (pg_trgm index backed), numeric queries also match the exact id """
+    search = search.strip()
+    condition = Project.name.ilike(f"%{search}%")
+    # isdigit() also accepts "²", which int() rejects; ids beyond integer range match nothing
+    if search.isdecimal() and int(search) < 2 ** 31:
+        return or_(Project.id == int(search), condition)
+    return condition
+
+
+def project_search_rank(search: str):
+    """ pg_trgm similarity of name to search, higher is better """
+    return func.similarity(Project.name, search.strip())
+
+
+PROJECT_SORT_MAP = {
+    "name": Project.name,
+    "id": Project.id,
+    "create_success": Project.create_success,
+    "status": case(
+        (Project.suspended == True, 3),
+        (Project.create_success == True, 0),
+        (Project.create_success == False, 2),
+        else_=1,
+    ),
+}
+# Python types of PROJECT_SORT_MAP keys, checked in keyset cursors
+PROJECT_SORT_TYPES = {
+    "name": str,
+    "id": int,
+    "create_success": bool,
+    "status": int,
+}
+
+# Created explicitly in init_db, create_all skips indexes of existing tables
+# and must not emit the gin_trgm_ops ones before pg_trgm is installed
+PROJECT_INDEXES = [
+    Index('ix_project_name_id', Project.name, Project.id),
+    Index(
+        'ix_project_name_trgm', Project.name,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    ),
+    Index('ix_project_group_association_group_id', ProjectGroupAssociation.c.group_id),
+    Index(
+        'ix_project_group_name_trgm', ProjectGroup.name,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    ),
+]
+for _index in PROJECT_INDEXES:
+    _index.table.indexes.discard(_index)
+
+
+def build_group_tree(session, project_ids, with_no_group: bool = True) -> List[dict]:
+    """
+        Groups of the given projects with their (visible) projects, one query over
+        project_group_association, ungrouped projects go to the NO_GROUP_NAME bucket
+    """
+    stmt = select(
+        ProjectGroup.id, ProjectGroup.name, Project.id, Project.name
+    ).select_from(Project).outerjoin(
+        ProjectGroupAssociation, ProjectGroupAssociation.c.project_id == Project.id
+    ).outerjoin(
+        ProjectGroup, ProjectGroupAssociation.c.group_id == ProjectGroup.id
+    ).where(
+        Project.id.in_(set(project_ids))
+    ).order_by(ProjectGroup.id.nulls_last(), Project.id)
+    #
+    groups = {}
+    no_group = dict(name=c.NO_GROUP_NAME, id=c.NO_GROUP_NAME, projects=[])
+    for group_id, group_name, project_id, project_name in session.execute(stmt):
+        if group_id is None:
+            no_group["projects"].append({"id": project_id, "name": project_name})
+            continue
+        if group_id not in groups:
+            groups[group_id] = dict(id=group_id, name=group_name, projects=[])
+        groups[group_id]["projects"].append({"id": project_id, "name": project_name})
+    #
+    result = list(groups.values())
+    if with_no_group:
+        result.append(no_group)
+    return result
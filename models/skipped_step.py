@@ -0,0 +1,48 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from sqlalchemy import Column, ForeignKey, Integer, String, delete, select
+
+from tools import db, config as c
+
+
+class ProjectSkippedStep(db.Base):
+    """ Creation steps not run for a project because none of its plugins needed them """
+    __tablename__ = "project_skipped_step"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    project_id = Column(
+        Integer,
+        ForeignKey(f'{c.POSTGRES_SCHEMA}.project.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    step = Column(String(64), primary_key=True)
+
+    @staticmethod
+    def add(session, project_id: int, steps: list[str]) -> None:
+        session.add_all([ProjectSkippedStep(project_id=project_id, step=step) for step in steps])
+
+    @staticmethod
+    def get(session, project_id: int, for_update: bool = False) -> set[str]:
+        """ for_update holds the rows until commit, so one provisioning of them runs at a time """
+        query = select(ProjectSkippedStep.step).where(ProjectSkippedStep.project_id == project_id)
+        if for_update:
+            query = query.with_for_update()
+        return set(session.execute(query).scalars())
+
+    @staticmethod
+    def remove(session, project_id: int, steps: list[str]) -> None:
+        session.execute(delete(ProjectSkippedStep).where(
+            ProjectSkippedStep.project_id == project_id,
+            ProjectSkippedStep.step.in_(steps),
+        ))
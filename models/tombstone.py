@@ -0,0 +1,97 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, exists, select, update
+
+from tools import db, config as c
+
+from .project import Project
+
+
+class ProjectTombstone(db.Base):
+    """
+        Project being deleted: hidden from listings while the GC worker tears down
+        its resources, goes away together with the project row
+    """
+    __tablename__ = "project_tombstone"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    project_id = Column(
+        Integer,
+        ForeignKey(f'{c.POSTGRES_SCHEMA}.project.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    job_id = Column(Integer, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    done_steps = Column(JSON, nullable=False, default=list)
+    # None when retries are exhausted, set again by a new delete request
+    next_attempt_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        return {
+            "project_id": self.project_id,
+            "job_id": self.job_id,
+            "attempts": self.attempts,
+            "done_steps": self.done_steps,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    @staticmethod
+    def add(session, project_id: int, job_id: int) -> None:
+        session.add(ProjectTombstone(project_id=project_id, job_id=job_id, attempts=0, done_steps=[]))
+
+    @staticmethod
+    def claim_due(session, limit: int, lease: timedelta) -> list[tuple]:
+        """
+            (project_id, job_id, attempts, done_steps) of tombstones due for an attempt; they are
+            pushed lease into the future, so other workers skip them and a crashed attempt is retried
+        """
+        now = datetime.utcnow()
+        rows = session.execute(
+            select(
+                ProjectTombstone.project_id, ProjectTombstone.job_id,
+                ProjectTombstone.attempts, ProjectTombstone.done_steps,
+            ).where(
+                ProjectTombstone.next_attempt_at <= now
+            ).order_by(
+                ProjectTombstone.next_attempt_at
+            ).limit(limit).with_for_update(skip_locked=True)
+        ).all()
+        if rows:
+            session.execute(
+                update(ProjectTombstone).where(
+                    ProjectTombstone.project_id.in_([row.project_id for row in rows])
+                ).values(next_attempt_at=now + lease)
+            )
+        session.commit()
+        return [tuple(row) for row in rows]
+
+    @staticmethod
+    def reschedule(session, project_id: int, attempts: int, done_steps: list[str],
+                   next_attempt_at: Optional[datetime]) -> None:
+        session.execute(
+            update(ProjectTombstone).where(ProjectTombstone.project_id == project_id).values(
+                attempts=attempts, done_steps=done_steps, next_attempt_at=next_attempt_at,
+            )
+        )
+        session.commit()
+
+    @staticmethod
+    def not_deleted():
+        """ Condition hiding projects being deleted from project listings """
+        return ~exists().where(ProjectTombstone.project_id == Project.id)
@@ -0,0 +1,90 @@
+#     Copyright 2025 EPAM Systems
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, delete, exists, func, select
+
+from tools import db, config as c
+
+from .project import Project
+
+# pg advisory lock key of warm pool refills
+WARM_POOL_REFILL_LOCK = 0x70726A01
+
+
+class ProjectWarmPool(db.Base):
+    """ Provisioned projects nobody owns yet, claimed as personal projects """
+    __tablename__ = "project_warm_pool"
+    __table_args__ = {"schema": c.POSTGRES_SCHEMA}
+
+    project_id = Column(
+        Integer,
+        ForeignKey(f'{c.POSTGRES_SCHEMA}.project.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def add(session, project_id: int) -> None:
+        session.add(ProjectWarmPool(project_id=project_id))
+
+    @staticmethod
+    def size(session) -> int:
+        """ Pooled projects, including ones still provisioning """
+        from .tombstone import ProjectTombstone
+        return session.execute(
+            select(func.count()).select_from(ProjectWarmPool).join(
+                Project, Project.id == ProjectWarmPool.project_id
+            ).where(ProjectTombstone.not_deleted())
+        ).scalar()
+
+    @staticmethod
+    def unfinished(session) -> list[int]:
+        """ Pooled projects whose provisioning did not succeed """
+        from .tombstone import ProjectTombstone
+        return list(session.execute(
+            select(ProjectWarmPool.project_id).join(
+                Project, Project.id == ProjectWarmPool.project_id
+            ).where(Project.create_success.is_(False), ProjectTombstone.not_deleted())
+        ).scalars())
+
+    @staticmethod
+    def try_lock_refill(session) -> bool:
+        """ One refill at a time across nodes, held until the session transaction ends """
+        return session.execute(
+            select(func.pg_try_advisory_xact_lock(WARM_POOL_REFILL_LOCK))
+        ).scalar()
+
+    @staticmethod
+    def claim(session) -> Optional[int]:
+        """ Take the oldest provisioned project, concurrent claims skip each other's rows; caller commits """
+        from .tombstone import ProjectTombstone
+        project_id = session.execute(
+            select(ProjectWarmPool.project_id).join(
+                Project, Project.id == ProjectWarmPool.project_id
+            ).where(
+                Project.create_success.is_(True), ProjectTombstone.not_deleted()
+            ).order_by(
+                ProjectWarmPool.created_at
+            ).limit(1).with_for_update(of=ProjectWarmPool, skip_locked=True)
+        ).scalar()
+        if project_id is not None:
+            session.execute(delete(ProjectWarmPool).where(ProjectWarmPool.project_id == project_id))
+        return project_id
+
+    @staticmethod
+    def not_pooled():
+        """ Condition hiding pooled projects from project listings """
+        return ~exists().where(ProjectWarmPool.project_id == Project.id)
@@ -15,12 +15,12 @@
 """ Module """
 
 import threading
-
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from queue import Empty
 
 import flask
-import cachetools  # pylint: disable=E0401
 
 from pylon.core.tools import module, log  # pylint: disable=E0611,E0401
 from pylon.core.tools.context import Context as Holder
@@ -29,6 +29,8 @@ from .models.project import Project
 from sqlalchemy.exc import ProgrammingError
 from tools import db_migrations, config as c  # pylint: disable=E0401
 from .utils.rabbit_utils import fix_rabbit_vhost
+from .utils.caches import UserIndexedTTLCache, SingleFlight, CacheRefresher, InvalidationQueue
+from .utils.helpers import KeyedLock
 
 
 class Module(module.ModuleModel):
@@ -36,10 +38,66 @@ class Module(module.ModuleModel):
         self.context = context
         self.descriptor = descriptor
         #
-        self.projects_lock = threading.RLock()
+        # Serializes personal project create/fix per user, runs for different users are independent
+        self.personal_project_locks = KeyedLock()
+        #
+        # Keys: (user_id, *kwargs) and (user_id,)
+        self.user_projects_cache = UserIndexedTTLCache(
+            maxsize=20480, ttl=300, user_getter=lambda key: key[0],
+        )
+        self.check_public_role_cache = UserIndexedTTLCache(
+            maxsize=20480, ttl=300, user_getter=lambda key: key[0],
+        )
+        # Keys: (user_id, membership fingerprint, shared groups version or 0, with_no_group)
+        # Group changes clear it on every node, the short ttl covers nodes the clear missed
+        self.group_tree_cache = UserIndexedTTLCache(
+            maxsize=20480, ttl=60, user_getter=lambda key: key[0],
+        )
+        self.user_projects_flight = SingleFlight()
+        # name -> cache, for stats, runtime tuning and cross-node invalidation
+        self.caches = {
+            "user_projects": self.user_projects_cache,
+            "check_public_role": self.check_public_role_cache,
+            "group_tree": self.group_tree_cache,
+        }
+        # Entries expiring within refresh_ahead seconds are recomputed in background
+        self.cache_refresher = CacheRefresher(
+            refresh_ahead=self.descriptor.config.get("user_caches_refresh_ahead", 60),
+        )
+        #
+        self.membership_index_ready = False
+        #
+        self.provisioning_pool = ThreadPoolExecutor(
+            max_workers=self.descriptor.config.get("provisioning_max_workers", 4),
+            thread_name_prefix="projects_provisioning",
+        )
+        self.project_gc_pool = ThreadPoolExecutor(
+            max_workers=self.descriptor.config.get("project_gc_max_workers", 2),
+            thread_name_prefix="projects_gc",
+        )
+        #
+        self.cache_bus = None  # set by shared_caches init when enabled
+        #
+        # APIs, events and RPCs are registered before the inits, which only start the workers
+        config = self.descriptor.config
+        self.invalidation_queue = InvalidationQueue(
+            resolve=lambda project_ids: self.resolve_project_users(project_ids),
+            evict=lambda user_ids: self.clear_user_projects_cache(user_ids),
+            max_delay=config.get("cache_invalidation_max_delay", 1),
+        )
+        #
+        self.project_gc_interval = config.get("project_gc_interval", 30)
+        self.project_gc_batch = config.get("project_gc_max_workers", 2)
+        self.project_gc_max_attempts = int(config.get("project_gc_max_attempts", 5))
+        self.project_gc_retry_delay = config.get("project_gc_retry_delay", 60)
+        self.project_gc_lease = timedelta(seconds=config.get("project_gc_lease", 3600))
+        self.project_gc_event = threading.Event()
         #
-        self.user_projects_cache = cachetools.TTLCache(maxsize=20480, ttl=300)
-        self.check_public_role_cache = cachetools.TTLCache(maxsize=20480, ttl=300)
+        self.warm_pool_size = int(config.get("warm_pool_size", 0))
+        self.warm_pool_plugins = list(config.get("warm_pool_plugins", ["configuration", "models"]))
+        self.warm_pool_owner_id = config.get("warm_pool_owner_id", 1)
+        self.warm_pool_check_interval = config.get("warm_pool_check_interval", 60)
+        self.warm_pool_event = threading.Event()
 
     def init(self):
         """ Init module """
@@ -101,6 +159,9 @@ class Module(module.ModuleModel):
     def deinit(self):  # pylint: disable=R0201
         """ De-init module """
         log.info("De-initializing module")
+        self.cache_refresher.shutdown()
+        self.provisioning_pool.shutdown(wait=False, cancel_futures=True)
+        self.project_gc_pool.shutdown(wait=False, cancel_futures=True)
         self.descriptor.deinit_deinits()  # TODO: new-style init_all/deinit_all
 
     def _before_request_hook(self):
@@ -1,73 +1,120 @@
+import hashlib
+import json
 from typing import List, Literal
 
-from sqlalchemy import not_
-from ..models.pd.group import GroupListModel
-from ..models.pd.project import ProjectListModel
-from ..models.project import Project, ProjectGroup
+from sqlalchemy import not_, select
+from ..models.counter import ProjectCounter, GROUPS_VERSION
+from ..models.project import Project, ProjectGroup, build_group_tree, project_list_columns
+from ..utils.caches import cached
 
-from tools import rpc_tools, db, serialize, config as c
+from tools import rpc_tools, db, this, config as c
 from pylon.core.tools import web, log
 
 
+def membership_fingerprint(project_ids) -> str:
+    return hashlib.sha1(",".join(map(str, sorted(project_ids))).encode()).hexdigest()
+
+
+def groups_version(module) -> int:
+    """ Without the invalidation bus other nodes' group changes only show in the shared version """
+    if module.cache_bus is not None:
+        return 0
+    with db.get_session() as session:
+        return ProjectCounter.get(session, GROUPS_VERSION)
+
+
+@cached(
+    cache=this.module.group_tree_cache,
+    key=lambda module, user_id, project_ids, with_no_group: (
+        user_id, membership_fingerprint(project_ids), groups_version(module), with_no_group
+    ),
+)
+def get_group_tree(module, user_id: int, project_ids, with_no_group: bool) -> dict:
+    """ Group tree of a user with an ETag over its content, one cache entry per membership set """
+    with db.get_session() as session:
+        groups = build_group_tree(session, project_ids, with_no_group=with_no_group)
+    etag = hashlib.sha1(json.dumps(groups, sort_keys=True, default=str).encode()).hexdigest()
+    return {"etag": etag, "groups": groups}
+
+
 class RPC:
     @web.rpc('project_get_available_projects_in_group', 'get_available_projects_in_group')
     @rpc_tools.wrap_exceptions(RuntimeError)
-    def get_available_projects_in_group(self, user_id: int, group_id: int | Literal[c.NO_GROUP_NAME]) -> List[dict]:
+    def get_available_projects_in_group(
+            self, user_id: int, group_id: int | Literal[c.NO_GROUP_NAME], fields: list | str = None
+    ) -> List[dict]:
         with db.get_session() as session:
             user_projects = self.list_user_projects(user_id)
             user_projects_ids = [i['id'] for i in user_projects]
+            stmt = select(*project_list_columns(fields)).where(Project.id.in_(user_projects_ids))
             if group_id == c.NO_GROUP_NAME:
-                projects = session.query(Project).filter(
-                    Project.id.in_(user_projects_ids),
-                    not_(Project.groups.any())
-                ).all()
+                stmt = stmt.where(not_(Project.groups.any()))
             else:
-                projects = session.query(Project).filter(
-                    Project.id.in_(user_projects_ids),
-                    Project.groups.any(id=group_id)
-                ).all()
+                stmt = stmt.where(Project.groups.any(id=group_id))
+            projects = [dict(row._mapping) for row in session.execute(stmt.order_by(Project.id))]
 
-            log.info(f'project_get_available_projects_in_group\n{[ProjectListModel.from_orm(i).dict() for i in projects]}')
+            log.info(f'project_get_available_projects_in_group\n{projects}')
 
-            return [ProjectListModel.from_orm(i).dict() for i in projects]
+            return projects
 
     @web.rpc('project_get_available_groups', 'get_available_groups')
     @rpc_tools.wrap_exceptions(RuntimeError)
     def get_available_groups(self, user_id: int) -> List[dict]:
-        user_projects = self.list_user_projects(user_id)
-        user_projects_ids = set(i['id'] for i in user_projects)
+        return self.get_group_tree(user_id, with_no_group=False)["groups"]
 
-        with db.get_session() as session:
-            groups = session.query(ProjectGroup).join(
-                ProjectGroup.projects
-            ).filter(Project.id.in_(user_projects_ids)).all()
-
-            return [
-                dict(
-                    id=g.id,
-                    name=g.name,
-                    projects=[
-                        {"id": p.id, "name": p.name}
-                        for p in g.projects.all()
-                        if p.id in user_projects_ids
-                    ]
-                ) for g in groups
-            ]
+    @web.rpc('project_get_group_tree', 'get_group_tree')
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def get_group_tree(self, user_id: int, with_no_group: bool = True, project_ids: list = None) -> dict:
+        """
+            {"etag", "groups"}, served from cache while memberships and groups are unchanged
 
-    @web.rpc('project_get_all_groups', 'get_all_groups')
+            project_ids of the user skip another list_user_projects when the caller has them
+        """
+        if project_ids is None:
+            project_ids = [i['id'] for i in self.list_user_projects(user_id)]
+        return get_group_tree(self, user_id, project_ids, with_no_group)
+
+    @web.rpc('project_invalidate_group_trees', 'invalidate_group_trees')
     @rpc_tools.wrap_exceptions(RuntimeError)
-    def get_all_groups(self, name_filter: str = None) -> List[dict]:
-        filters = list()
-        if name_filter:
-            filters.append(ProjectGroup.name.ilike(f"%{name_filter}%"))
+    def invalidate_group_trees(self) -> None:
+        """ For changes made outside this plugin, ours drop group trees themselves """
+        self.drop_group_trees()
 
-        with (db.get_session() as session):
-            query = session.query(ProjectGroup).all()
+    @web.rpc('project_get_all_groups', 'get_all_groups')
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def get_all_groups(self, name_filter: str = None,
+                       limit: int = None, offset: int = None,
+                       cursor: str = None, with_counts: bool = False) -> List[dict] | dict:
+        """ Group catalog, see ProjectGroup.list_groups for cursor and with_counts """
+        return ProjectGroup.list_groups(
+            search=name_filter, limit=limit, offset=offset,
+            cursor=cursor, with_counts=with_counts,
+        )
 
-            if filters:
-                query = query.filter(*filters)
+    @web.rpc('project_set_projects_groups', 'set_projects_groups')
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def set_projects_groups(self, project_groups: dict) -> dict:
+        """
+            Replace groups of many projects in one transaction: {project_id: [group names]}
 
-            project_with_group = [
-                serialize(GroupListModel.from_orm(group)) for group in query
-            ]
-        return project_with_group
+            Nothing is changed when some projects do not exist, they are listed in not_found
+        """
+        project_groups = {
+            int(project_id): sorted(set(names))
+            for project_id, names in project_groups.items()
+        }
+        with db.get_session() as session:
+            existing = set(session.scalars(
+                select(Project.id).where(Project.id.in_(project_groups.keys()))
+            ).all())
+            not_found = sorted(set(project_groups) - existing)
+            if not_found:
+                return {"updated": [], "not_found": not_found}
+            #
+            updated = ProjectGroup.set_project_groups(session, project_groups)
+            session.commit()
+        #
+        self.enqueue_cache_invalidation(project_ids=updated)
+        if updated:
+            self.drop_group_trees()
+        return {"updated": sorted(updated), "not_found": []}
@@ -1,9 +1,11 @@
+import bisect
 import time
 from collections import defaultdict
 import re
 from traceback import format_exc
 
 from pydantic.v1 import ValidationError
+from sqlalchemy import func, select
 from tools import auth
 from tools import rpc_tools
 from tools import db
@@ -12,11 +14,14 @@ from tools import this
 from pylon.core.tools import web
 from pylon.core.tools import log
 
-import cachetools
 from ..api.v1.project import delete_project
-from ..models.project import Project
+from ..models.project import Project, encode_cursor, decode_cursor, select_fields, PROJECT_CURSOR_TYPES
+from ..models.membership import ProjectUserMembership
+from ..models.counter import ProjectCounter, MEMBERSHIP_INDEX_BUILT
+from ..models.tombstone import ProjectTombstone
 from ..models.pd.project import ProjectCreatePD
-from ..utils.project_steps import create_project
+from ..utils.project_steps import create_project, resume_project
+from ..utils.caches import cached
 from ..constants import (
     PROJECT_PERSONAL_NAME_TEMPLATE,
     PROJECT_USER_EMAIL_TEMPLATE,
@@ -24,6 +29,76 @@ from ..constants import (
 )
 
 
+PERSONAL_PROJECT_ROLES = ('editor', 'viewer', 'monitor')
+# pg advisory lock key of personal project creation, second key is the user id
+PERSONAL_PROJECT_LOCK = 0x70726A02
+
+
+def to_int(value) -> int | None:
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+@cached(
+    cache=this.module.user_projects_cache,
+    key=lambda module, user_id: (user_id,),
+    flight=this.module.user_projects_flight,
+    refresher=this.module.cache_refresher,
+)
+def get_user_projects(module, user_id: int) -> list:
+    """ All projects of a user sorted by id, one cache entry per user """
+    if module.membership_index_ready:
+        return Project.list_user_projects(user_id)
+    #
+    # Membership index is not built yet: check every project against admin
+    all_projects = module.list()
+    #
+    user_projects = []
+    check_ids = []
+    project_map = {}
+    #
+    for project in all_projects:
+        check_ids.append(project["id"])
+        project_map[project["id"]] = project
+    #
+    user_in_ids = module.context.rpc_manager.call.admin_check_user_in_projects(check_ids, user_id)
+    #
+    for project_id in sorted(user_in_ids):
+        user_projects.append(project_map[project_id])
+    #
+    return user_projects
+
+
+def paginate_projects(projects: list, offset_=None, limit_=None, search_=None,
+                      filter_: dict | None = None, cursor_: str | None = None) -> list | dict:
+    """
+        Search, filter and page a cached project list in memory
+
+        With cursor_ ("" for the first page) pages by id and returns {"rows", "next_cursor"}
+    """
+    if search_:
+        needle = search_.lower()
+        projects = [p for p in projects if needle in p["name"].lower()]
+    if filter_:
+        projects = [p for p in projects if all(p.get(k) == v for k, v in filter_.items())]
+    limit_ = to_int(limit_)
+    if cursor_ is None:
+        offset_ = to_int(offset_) or 0
+        if limit_ is None:
+            return projects[offset_:]
+        return projects[offset_:offset_ + limit_]
+    #
+    if cursor_:
+        after_id = decode_cursor(cursor_, PROJECT_CURSOR_TYPES)[0]
+        projects = projects[bisect.bisect_right([p["id"] for p in projects], after_id):]
+    next_cursor = None
+    if limit_ is not None and len(projects) > limit_:
+        projects = projects[:limit_]
+        next_cursor = encode_cursor([projects[-1]["id"]])
+    return {"rows": projects, "next_cursor": next_cursor}
+
+
 def create_keycloak_user(user_email: str, *, rpc_manager, default_password: str = "11111111") -> None:
     if "auth_manager" not in context.module_manager.modules:
         return
@@ -64,14 +139,43 @@ def create_keycloak_user(user_email: str, *, rpc_manager, default_password: str
 def create_personal_project(user_id: int,
                             module,
                             plugins: list = ('configuration', 'models'),
-                            roles: list = ('editor', 'viewer', 'monitor')
+                            roles: list = PERSONAL_PROJECT_ROLES
                             ):
+    # personal_project_locks only covers this node, held until lock_session ends
+    with db.with_project_schema_session(None) as lock_session:
+        lock_session.execute(select(func.pg_advisory_xact_lock(PERSONAL_PROJECT_LOCK, user_id)))
+        return _create_personal_project(user_id, module, plugins, roles)
+
+
+def _create_personal_project(user_id: int, module, plugins: list, roles: list):
     project_name = PROJECT_PERSONAL_NAME_TEMPLATE.format(user_id=user_id)
     #
     with db.with_project_schema_session(None) as session:
-        p = session.query(Project).where(Project.name == project_name).first()
+        p = session.query(Project).where(
+            Project.name == project_name, ProjectTombstone.not_deleted()
+        ).first()
+    #
+    # under the lock a failed creation is not in flight anywhere, resume it right away
+    if p and not p.create_success:
+        try:
+            if resume_project(module, p.id, list(roles)) is not None:
+                log.info(f'Personal project {project_name} creation resumed')
+                return True
+        except Exception:
+            log.critical(format_exc())
+            return False
+        # no checkpoints (created before they were kept), rebuild it
+        delete_project(project_id=p.id, module=module)
+        p = None
     #
     if not p:
+        try:
+            if module.claim_warm_project(user_id, project_name, list(plugins), list(roles)) is not None:
+                log.info(f'Personal project {project_name} claimed from warm pool')
+                return True
+        except Exception:
+            log.exception('Failed to claim warm pool project for %s', user_id)
+        #
         project_admin_email = module.context.rpc_manager.call.auth_get_user(user_id)['email']
         try:
             project_model = ProjectCreatePD(
@@ -91,7 +195,8 @@ def create_personal_project(user_id: int,
         }
         #
         try:
-            create_project(module, context)
+            # no rollback, a failed creation is resumed from its checkpoints
+            create_project(module, context, rollback_on_error=False)
             log.info(f'Personal project {project_name} created')
             return True
         except Exception:
@@ -109,32 +214,44 @@ def is_system_user(email: str) -> bool:
 class RPC:
     @web.rpc("list_user_projects", "list_user_projects")
     @rpc_tools.wrap_exceptions(RuntimeError)
-    @cachetools.cached(cache=this.module.user_projects_cache)
-    def list_user_projects(self, user_id: int, **kwargs) -> list:
-        all_projects = self.list(**kwargs)
-        #
-        user_projects = []
-        check_ids = []
-        project_map = {}
-        #
-        for project in all_projects:
-            check_ids.append(project["id"])
-            project_map[project["id"]] = project
-        #
-        user_in_ids = self.context.rpc_manager.call.admin_check_user_in_projects(check_ids, user_id)
-        #
-        for project_id in user_in_ids:
-            user_projects.append(project_map[project_id])
+    def list_user_projects(self, user_id: int, offset_=None, limit_=None, search_=None,
+                           filter_: dict | None = None, cursor_: str | None = None,
+                           fields_: list | str | None = None, **kwargs) -> list | dict:
+        result = paginate_projects(
+            get_user_projects(self, user_id),
+            offset_=offset_, limit_=limit_, search_=search_, filter_=filter_, cursor_=cursor_,
+        )
+        if not fields_:
+            return result
+        if isinstance(result, dict):
+            return {**result, "rows": select_fields(result["rows"], fields_)}
+        return select_fields(result, fields_)
+
+    @web.rpc("projects_rebuild_membership_index", "rebuild_membership_index")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def rebuild_membership_index(self) -> int:
+        """ Re-read project members from admin plugin into the local index """
+        with db.with_project_schema_session(None) as session:
+            ProjectCounter.set(session, MEMBERSHIP_INDEX_BUILT, 0)
+            session.commit()
+            project_ids = [i[0] for i in session.query(Project.id).all()]
+            for project_id in project_ids:
+                user_ids = self.context.rpc_manager.call.admin_get_users_ids_in_project(project_id)
+                ProjectUserMembership.replace(session, project_id, user_ids)
+                session.commit()
+            ProjectCounter.set(session, MEMBERSHIP_INDEX_BUILT, 1)
+            session.commit()
         #
-        return user_projects
+        self.membership_index_ready = True
+        self.user_projects_cache.clear()
+        log.info("Membership index rebuilt for %s projects", len(project_ids))
+        return len(project_ids)
 
     @web.rpc("clear_user_projects_cache", "clear_user_projects_cache")
     @rpc_tools.wrap_exceptions(RuntimeError)
     def clear_user_projects_cache(self, user_ids):
-        for cached_key in list(self.user_projects_cache.keys()):
-            cached_user_id = cached_key[1]  # cached_func, cached_user_id, ...
-            if cached_user_id in user_ids:
-                self.user_projects_cache.pop(cached_key, None)
+        self.user_projects_cache.pop_users(user_ids)
+        self.broadcast_cache_invalidation("user_projects", user_ids)
 
     @web.rpc("add_user_to_project_or_create", "add_user_to_project_or_create")
     @rpc_tools.wrap_exceptions(RuntimeError)
@@ -209,14 +326,13 @@ class RPC:
             if not is_system_user(user["email"]):
                 project_name = PROJECT_PERSONAL_NAME_TEMPLATE.format(user_id=user['id'])
                 with db.with_project_schema_session(None) as session:
-                    project = session.query(Project).where(Project.name == project_name).first()
-                    if not project:
-                        with self.projects_lock:
-                            create_personal_project(user_id=user['id'], module=self)
-                    elif not project.create_success:
-                        with self.projects_lock:
-                            delete_project(project_id=project.id, module=self)
-                            create_personal_project(user_id=user['id'], module=self)
+                    project = session.query(Project).where(
+                        Project.name == project_name, ProjectTombstone.not_deleted()
+                    ).first()
+                if not project or not project.create_success:
+                    # missing ones are created, failed ones resumed (or rebuilt without checkpoints)
+                    with self.personal_project_locks(user['id']):
+                        create_personal_project(user_id=user['id'], module=self)
 
     @web.rpc("projects_get_personal_project_id", "get_personal_project_id")
     @rpc_tools.wrap_exceptions(RuntimeError)
@@ -225,7 +341,9 @@ class RPC:
             return
         project_name = PROJECT_PERSONAL_NAME_TEMPLATE.format(user_id=user_id)
         with db.with_project_schema_session(None) as session:
-            project = session.query(Project).where(Project.name == project_name).first()
+            project = session.query(Project).where(
+                Project.name == project_name, ProjectTombstone.not_deleted()
+            ).first()
 
             if project and self.context.rpc_manager.call.admin_check_user_in_project(project.id, user_id):
                 return project.id
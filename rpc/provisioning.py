@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+# coding=utf-8
+# pylint: disable=E1101
+
+""" RPC """
+
+from pylon.core.tools import web, log  # pylint: disable=E0611,E0401,W0611
+
+from tools import db, rpc_tools  # pylint: disable=E0401
+
+from ..models.job import ProvisioningJob
+from ..models.tombstone import ProjectTombstone
+from ..models.pd.project import ProjectCreatePD
+from ..utils.project_steps import create_projects_bulk, resume_project
+
+
+class RPC:  # pylint: disable=R0903
+    """ RPC pseudo-class """
+
+    @web.rpc("projects_create_project_async", "create_project_async")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def create_project_async(self, project_data: dict, owner_id: int, roles: list | None = None) -> dict:
+        """ Start background provisioning, poll get_provisioning_job with the returned id """
+        project_model = ProjectCreatePD.parse_obj(project_data)
+        job_id = self.submit_provisioning_job(project_model, owner_id, roles or ['admin'])
+        return self.get_provisioning_job(job_id)
+
+    @web.rpc("projects_get_provisioning_job", "get_provisioning_job")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def get_provisioning_job(self, job_id: int) -> dict | None:
+        """ Job status with per step status['created'] / status['deleted'] dicts """
+        with db.with_project_schema_session(None) as session:
+            return ProvisioningJob.get(session, int(job_id))
+
+    @web.rpc("projects_create_projects_bulk", "create_projects_bulk")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def create_projects_bulk(self, projects: list[dict], owner_id: int, roles: list | None = None) -> list[dict]:
+        """ Batch provisioning, one {name, project_id, ok, steps, rollback_steps} per project """
+        project_models = [ProjectCreatePD.parse_obj(i) for i in projects]
+        return create_projects_bulk(self, project_models, owner_id, roles or ['admin'])
+
+    @web.rpc("projects_ensure_project_resources", "ensure_project_resources_rpc")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def ensure_project_resources_rpc(self, project_id: int, plugins: list | None = None) -> list[dict]:
+        """
+            Call before first use of a plugin (pass it in plugins) to create its resources
+            if they were skipped at project creation, cheap when nothing is missing
+        """
+        return self.ensure_project_resources(int(project_id), plugins)
+
+    @web.rpc("projects_get_project_deletion", "get_project_deletion")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def get_project_deletion(self, project_id: int) -> dict | None:
+        """ Tombstone retry state with its job, None when the project is not being deleted """
+        with db.with_project_schema_session(None) as session:
+            tombstone = session.get(ProjectTombstone, int(project_id))
+            if tombstone is None:
+                return None
+            return {**tombstone.to_dict(), "job": ProvisioningJob.get(session, tombstone.job_id)}
+
+    @web.rpc("projects_resume_project", "resume_project_rpc")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def resume_project_rpc(self, project_id: int, roles: list | None = None) -> list[dict] | None:
+        """ Finish a failed creation from its checkpoints, None when it has none """
+        progress = resume_project(self, int(project_id), roles or ['admin'])
+        if progress is None:
+            return None
+        return [step.status['created'] for step in progress]
@@ -6,11 +6,17 @@
 
 from pylon.core.tools import web, log  # pylint: disable=E0611,E0401,W0611
 
-from tools import auth  # pylint: disable=E0401
+from tools import auth, rpc_tools  # pylint: disable=E0401
+
+from ..utils.caches import parse_cache_limits
 
 
 def clear_cache(cache, key_getter, target_value):
     """ Clear cache """
+    if hasattr(cache, "pop_user"):
+        cache.pop_user(target_value)
+        return
+    #
     for key in list(cache.keys()):
         key_value = key_getter(key)
         #
@@ -24,8 +30,10 @@ class RPC:  # pylint: disable=R0903
     @web.rpc()
     def invalidate_user_caches(self, user_id):
         """ Invalidate user caches """
-        clear_cache(self.user_projects_cache, lambda x: x[1], user_id)
-        clear_cache(self.check_public_role_cache, lambda x: x[0], user_id)
+        self.user_projects_cache.pop_user(user_id)
+        self.check_public_role_cache.pop_user(user_id)
+        self.broadcast_cache_invalidation("user_projects", [user_id])
+        self.broadcast_cache_invalidation("check_public_role", [user_id])
         #
         if hasattr(auth, "get_user_permissions_cache"):
             clear_cache(auth.get_user_permissions_cache, lambda x: x[0], user_id)
@@ -33,3 +41,31 @@ class RPC:  # pylint: disable=R0903
             clear_cache(auth.get_user_cache, lambda x: x[0], user_id)
         #
         # FIXME: cachetools caches have specific key schemas for kwargs calls
+
+    @web.rpc("projects_get_cache_stats", "get_cache_stats")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def get_cache_stats(self):
+        """ Per-cache counters, sizes and compute latency """
+        return {
+            "caches": {name: cache.stats() for name, cache in self.caches.items()},
+            "single_flight": {
+                "user_projects": self.user_projects_flight.stats(),
+            },
+            "refresh": {
+                "refresh_ahead": self.cache_refresher.refresh_ahead,
+                **self.cache_refresher.stats(),
+            },
+            "invalidation": self.invalidation_queue.stats(),
+        }
+
+    @web.rpc("projects_configure_cache", "configure_cache")
+    @rpc_tools.wrap_exceptions(RuntimeError)
+    def configure_cache(self, name, maxsize=None, ttl=None):
+        """ Change cache limits without restart """
+        cache = self.caches.get(name)
+        if cache is None:
+            raise ValueError(f"Unknown cache: {name}")
+        maxsize, ttl = parse_cache_limits(maxsize, ttl)
+        cache.resize(maxsize=maxsize, ttl=ttl)
+        log.info("Cache %s configured: maxsize=%s ttl=%s", name, cache.maxsize, cache.ttl)
+        return cache.stats()
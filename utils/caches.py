@@ -0,0 +1,667 @@
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Cache helpers """
+
+import functools
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+import cachetools  # pylint: disable=E0401
+import redis  # pylint: disable=E0401
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401
+
+
+def approx_sizeof(obj, seen: Optional[set] = None) -> int:
+    """ Rough deep size of plain containers, in bytes """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_sizeof(k, seen) + approx_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_sizeof(i, seen) for i in obj)
+    return size
+
+
+def parse_cache_limits(maxsize=None, ttl=None) -> tuple[Optional[int], Optional[float]]:
+    """ Validated resize arguments, raises ValueError / TypeError """
+    maxsize = int(maxsize) if maxsize is not None else None
+    ttl = float(ttl) if ttl is not None else None
+    if maxsize is not None and maxsize <= 0:
+        raise ValueError(f"maxsize must be positive: {maxsize}")
+    if ttl is not None and ttl <= 0:
+        raise ValueError(f"ttl must be positive: {ttl}")
+    return maxsize, ttl
+
+
+class RedisCacheTier:
+    """
+        Shared L2 cache tier
+
+        Entries of one user live in one redis hash, so dropping a user is a single DEL
+    """
+
+    def __init__(self, client: redis.Redis, name: str, ttl: float, user_getter: Callable):
+        self.client = client
+        self.prefix = f"projects:cache:{name}"
+        self.ttl = ttl
+        self.user_getter = user_getter
+
+    def _user_name(self, user_id) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _location(self, key) -> tuple[str, str]:
+        return self._user_name(self.user_getter(key)), json.dumps(key, default=str)
+
+    def get(self, key):
+        name, field = self._location(key)
+        try:
+            raw = self.client.hget(name, field)
+        except redis.RedisError as e:
+            log.warning("Shared cache %s get failed: %s", self.prefix, e)
+            raise KeyError(key) from e
+        if raw is None:
+            raise KeyError(key)
+        stored_at, value = json.loads(raw)
+        if time.time() - stored_at > self.ttl:
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value) -> None:
+        name, field = self._location(key)
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(name, field, json.dumps([time.time(), value]))
+            pipe.expire(name, int(self.ttl) + 1)
+            pipe.execute()
+        except (redis.RedisError, TypeError, ValueError) as e:
+            log.warning("Shared cache %s set failed: %s", self.prefix, e)
+
+    def delete_users(self, user_ids: Iterable) -> None:
+        names = [self._user_name(i) for i in set(user_ids or [])]
+        if not names:
+            return
+        try:
+            self.client.delete(*names)
+        except redis.RedisError as e:
+            log.warning("Shared cache %s delete failed: %s", self.prefix, e)
+
+    def clear(self) -> None:
+        try:
+            names = list(self.client.scan_iter(match=f"{self.prefix}:*"))
+            if names:
+                self.client.delete(*names)
+        except redis.RedisError as e:
+            log.warning("Shared cache %s clear failed: %s", self.prefix, e)
+
+
+class CacheInvalidationBus:
+    """ Broadcasts per-user cache invalidations to every node over redis pub/sub """
+
+    channel = "projects:cache:invalidation"
+
+    def __init__(self, client: redis.Redis, caches: dict):
+        self.client = client
+        self.caches = caches
+        self.origin = str(uuid.uuid4())
+
+    def publish(self, cache_name: str, user_ids: Iterable) -> None:
+        message = {
+            "origin": self.origin,
+            "cache": cache_name,
+            "user_ids": list(set(user_ids or [])),
+        }
+        try:
+            self.client.publish(self.channel, json.dumps(message))
+        except redis.RedisError as e:
+            log.warning("Cache invalidation publish failed: %s", e)
+
+    def publish_clear(self, cache_name: str) -> None:
+        message = {
+            "origin": self.origin,
+            "cache": cache_name,
+            "clear": True,
+        }
+        try:
+            self.client.publish(self.channel, json.dumps(message))
+        except redis.RedisError as e:
+            log.warning("Cache invalidation publish failed: %s", e)
+
+    def handle(self, message: dict) -> None:
+        if message.get("origin") == self.origin:
+            return
+        cache = self.caches.get(message.get("cache"))
+        if cache is None:
+            return
+        if message.get("clear"):
+            cache.clear(shared=False)
+            return
+        cache.pop_users(message.get("user_ids"), shared=False)
+
+    def listen(self, stop_event: threading.Event, timeout: float = 1) -> None:
+        """ Blocking listener loop, run in a daemon thread """
+        while not stop_event.is_set():
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while not stop_event.is_set():
+                    raw = pubsub.get_message(timeout=timeout)
+                    if raw is None:
+                        continue
+                    self.handle(json.loads(raw["data"]))
+            except redis.RedisError as e:
+                log.warning("Cache invalidation listener error, reconnecting: %s", e)
+                stop_event.wait(timeout)
+            except:  # pylint: disable=W0702
+                log.exception("Error during cache invalidation processing, skipping")
+
+
+class UserIndexedTTLCache(cachetools.TTLCache):
+    """
+        TTL cache with a user_id -> keys reverse index
+
+        user_getter extracts user_id from a cache key, so all entries of a user
+        can be dropped without scanning the whole cache.
+        Optional l2 (RedisCacheTier) is written through and read with load_shared
+    """
+
+    def __init__(
+            self, maxsize: int, ttl: float,
+            user_getter: Callable[[Hashable], Any] = lambda key: key[0],
+            **kwargs
+    ):
+        super().__init__(maxsize, ttl, **kwargs)
+        self.cache_kwargs = kwargs  # timer / getsizeof, reused when resize rebuilds the cache
+        self.user_getter = user_getter
+        self.user_keys = defaultdict(set)
+        self.expires = OrderedDict()  # key -> expire time, in expiration order
+        self.lock = threading.RLock()
+        self.l2: Optional[RedisCacheTier] = None
+        # Bumped on invalidation, so computations started before it are not stored
+        self.epoch = 0
+        self.generations = defaultdict(int)
+        #
+        self.hits = 0
+        self.misses = 0
+        self.evictions_ttl = 0
+        self.evictions_capacity = 0
+        self.compute_count = 0
+        self.compute_seconds = 0.0
+        self._setting = False
+
+    def _get_user(self, key):
+        try:
+            return self.user_getter(key)
+        except (IndexError, KeyError, TypeError):
+            return None
+
+    def _unindex(self, key):
+        self.expires.pop(key, None)
+        user_id = self._get_user(key)
+        keys = self.user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self.user_keys.pop(user_id, None)
+
+    def _set_local(self, key, value):
+        with self.lock:
+            self._setting = True
+            try:
+                super().__setitem__(key, value)
+            finally:
+                self._setting = False
+            self.expires[key] = self.timer() + self.ttl
+            self.expires.move_to_end(key)
+            self.user_keys[self._get_user(key)].add(key)
+
+    def __setitem__(self, key, value, **kwargs):
+        self._set_local(key, value)
+        if self.l2 is not None:
+            self.l2.set(key, value)
+
+    def generation(self, key) -> tuple:
+        with self.lock:
+            return self.epoch, self.generations.get(self._get_user(key), 0)
+
+    def set_if_current(self, key, value, generation: tuple) -> bool:
+        """ Store value unless the user was invalidated since generation was taken """
+        with self.lock:
+            if generation != self.generation(key):
+                return False
+            try:
+                self._set_local(key, value)
+            except ValueError:  # too large
+                return False
+        if self.l2 is not None:
+            self.l2.set(key, value)
+        return True
+
+    def _outlived(self, key) -> bool:
+        """ Entries kept by resize may have to expire before cachetools would drop them """
+        expires = self.expires.get(key)
+        return expires is not None and expires <= self.timer()
+
+    def __getitem__(self, key):
+        with self.lock:
+            if self._outlived(key):
+                self.expire()
+            return super().__getitem__(key)
+
+    def __contains__(self, key):
+        with self.lock:
+            return not self._outlived(key) and super().__contains__(key)
+
+    def expires_in(self, key) -> Optional[float]:
+        expires = self.expires.get(key)
+        if expires is None:
+            return None
+        return expires - self.timer()
+
+    def load_shared(self, key):
+        """ Fill local entry from l2, raises KeyError on miss """
+        if self.l2 is None:
+            raise KeyError(key)
+        value = self.l2.get(key)
+        try:
+            self._set_local(key, value)
+        except ValueError:  # too large
+            pass
+        return value
+
+    def __delitem__(self, key, **kwargs):
+        with self.lock:
+            try:
+                super().__delitem__(key, **kwargs)
+            finally:
+                if not cachetools.Cache.__contains__(self, key):
+                    self._unindex(key)
+
+    def expire(self, time=None):
+        """ Remove expired items, keeping the reverse index in sync """
+        with self.lock:
+            if time is None:
+                time = self.timer()
+            super().expire(time)
+            while self.expires:
+                key, expires = next(iter(self.expires.items()))
+                if time < expires:
+                    break
+                if cachetools.Cache.__contains__(self, key):
+                    cachetools.TTLCache.__delitem__(self, key)
+                self._unindex(key)
+                self.evictions_ttl += 1
+
+    def popitem(self):
+        with self.lock:
+            item = super().popitem()
+            if self._setting:
+                self.evictions_capacity += 1
+            return item
+
+    def pop_user(self, user_id, shared: bool = True) -> int:
+        """ Drop all entries of user, returns number of dropped local entries """
+        return self.pop_users([user_id], shared=shared)
+
+    def pop_users(self, user_ids: Iterable, shared: bool = True) -> int:
+        user_ids = set(user_ids or [])
+        dropped = 0
+        with self.lock:
+            for user_id in user_ids:
+                self.generations[user_id] += 1
+                keys = list(self.user_keys.get(user_id, ()))
+                for key in keys:
+                    # not pop(): __contains__ hides entries resize kept past their own expiry
+                    if cachetools.Cache.__contains__(self, key):
+                        cachetools.TTLCache.__delitem__(self, key)
+                    self._unindex(key)
+                dropped += len(keys)
+        if shared and self.l2 is not None:
+            self.l2.delete_users(user_ids)
+        return dropped
+
+    def clear(self, shared: bool = True):
+        with self.lock:
+            self.epoch += 1
+            cachetools.Cache.clear(self)
+            self.user_keys.clear()
+            self.expires.clear()
+        if shared and self.l2 is not None:
+            self.l2.clear()
+
+    def record_lookup(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def record_compute(self, seconds: float) -> None:
+        self.compute_count += 1
+        self.compute_seconds += seconds
+
+    def resize(self, maxsize: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """
+            Change limits at runtime: the cache is rebuilt with its live entries, oldest first,
+            each keeps its expiry cut to now + ttl, the oldest ones are evicted when it shrinks
+        """
+        with self.lock:
+            self.expire()
+            now = self.timer()
+            entries = [
+                (key, cachetools.Cache.__getitem__(self, key), expires)
+                for key, expires in self.expires.items()
+            ]
+            maxsize = self.maxsize if maxsize is None else maxsize
+            ttl = self.ttl if ttl is None else ttl
+            cachetools.TTLCache.__init__(self, maxsize, ttl, **self.cache_kwargs)
+            self.user_keys.clear()
+            self.expires.clear()
+            for key, value, expires in entries:
+                try:
+                    self._set_local(key, value)
+                except ValueError:  # too large for the new maxsize
+                    continue
+                # stays sorted: old expiries ascend and are capped by the same now + ttl
+                self.expires[key] = min(expires, now + ttl)
+            if self.l2 is not None:
+                self.l2.ttl = ttl
+
+    def stats(self) -> dict:
+        with self.lock:
+            self.expire()
+            # measured outside the lock, lookups do not wait for the walk
+            entries = [(key, cachetools.Cache.__getitem__(self, key)) for key in self.expires]
+            lookups = self.hits + self.misses
+            stats = {
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "currsize": self.currsize,
+                "users": len(self.user_keys),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions_ttl": self.evictions_ttl,
+                "evictions_capacity": self.evictions_capacity,
+                "avg_compute_seconds": round(
+                    self.compute_seconds / self.compute_count, 6
+                ) if self.compute_count else None,
+                "shared": self.l2 is not None,
+            }
+        stats["approx_bytes"] = approx_sizeof(entries)
+        return stats
+
+
+class SingleFlight:
+    """ One computation per key at a time, concurrent callers wait for its result """
+
+    class _Call:  # pylint: disable=R0903
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.misses = 0
+        self.coalesced = 0
+
+    def do(self, key, func: Callable, *args, **kwargs):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = SingleFlight._Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        #
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        #
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> dict:
+        return {
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.calls),
+        }
+
+
+class CacheRefresher:
+    """
+        Refresh-ahead for cached() entries
+
+        Hits on entries expiring within refresh_ahead seconds are served as is and
+        recomputed on a small pool; cache ttl stays the hard staleness bound
+    """
+
+    def __init__(self, refresh_ahead: float, max_workers: int = 2):
+        self.refresh_ahead = refresh_ahead
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="projects_cache_refresh",
+        )
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.refreshed = 0
+        self.failed = 0
+
+    def maybe_refresh(self, cache: UserIndexedTTLCache, key, func: Callable, args, kwargs) -> None:
+        if self.refresh_ahead <= 0:
+            return
+        expires_in = cache.expires_in(key)
+        if expires_in is None or expires_in > self.refresh_ahead:
+            return
+        token = (id(cache), key)
+        with self.lock:
+            if token in self.pending:
+                return
+            self.pending.add(token)
+        try:
+            self.pool.submit(self._refresh, token, cache, key, func, args, kwargs)
+        except RuntimeError:  # pool is shut down
+            with self.lock:
+                self.pending.discard(token)
+
+    def _refresh(self, token, cache: UserIndexedTTLCache, key, func: Callable, args, kwargs) -> None:
+        try:
+            generation = cache.generation(key)
+            start = time.perf_counter()
+            value = func(*args, **kwargs)
+            cache.record_compute(time.perf_counter() - start)
+            cache.set_if_current(key, value, generation)
+            self.refreshed += 1
+        except:  # pylint: disable=W0702
+            self.failed += 1
+            log.exception("Cache refresh failed for %s", key)
+        finally:
+            with self.lock:
+                self.pending.discard(token)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "pending": len(self.pending),
+        }
+
+
+class InvalidationQueue:
+    """
+        Coalescing user cache invalidation
+
+        Mutations enqueue user ids and project ids, run() flushes them in one batch
+        at most max_delay seconds after the oldest pending entry: project ids are
+        resolved to users with resolve, the deduplicated user set goes to evict
+    """
+
+    def __init__(self, resolve: Callable[[set], Iterable], evict: Callable[[set], Any],
+                 max_delay: float = 1):
+        self.resolve = resolve
+        self.evict = evict
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.pending_event = threading.Event()
+        self.user_ids = set()
+        self.project_ids = set()
+        self.oldest = None
+        self.enqueued = 0
+        self.batches = 0
+        self.evicted_users = 0
+        self.failed = 0
+        self.last_flush_seconds = 0.0
+
+    def enqueue(self, user_ids: Optional[Iterable] = None,
+                project_ids: Optional[Iterable] = None) -> None:
+        user_ids = set(user_ids or [])
+        project_ids = set(project_ids or [])
+        if not user_ids and not project_ids:
+            return
+        with self.lock:
+            self.user_ids.update(user_ids)
+            self.project_ids.update(project_ids)
+            self.enqueued += len(user_ids) + len(project_ids)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+        self.pending_event.set()
+
+    def flush(self) -> int:
+        """ Evict everything pending now, returns number of evicted users """
+        with self.lock:
+            user_ids, self.user_ids = self.user_ids, set()
+            project_ids, self.project_ids = self.project_ids, set()
+            self.oldest = None
+            self.pending_event.clear()
+        if not user_ids and not project_ids:
+            return 0
+        start = time.perf_counter()
+        try:
+            if project_ids:
+                user_ids.update(self.resolve(project_ids))
+            if user_ids:
+                self.evict(user_ids)
+        except:  # pylint: disable=W0702
+            self.failed += 1
+            log.exception("Cache invalidation batch failed, requeueing")
+            self.enqueue(user_ids, project_ids)
+            return 0
+        self.batches += 1
+        self.evicted_users += len(user_ids)
+        self.last_flush_seconds = time.perf_counter() - start
+        return len(user_ids)
+
+    def run(self, stop_event: threading.Event, timeout: float = 1) -> None:
+        """ Blocking worker loop, run in a daemon thread """
+        while not stop_event.is_set():
+            if not self.pending_event.wait(timeout):
+                continue
+            with self.lock:
+                oldest = self.oldest
+            if oldest is not None:
+                # Let more mutations join the batch, up to max_delay after the oldest one
+                stop_event.wait(max(0.0, oldest + self.max_delay - time.monotonic()))
+            failed = self.failed
+            self.flush()
+            if self.failed != failed:
+                stop_event.wait(timeout)  # do not spin on a failing resolve / evict
+        self.flush()
+
+    def stats(self) -> dict:
+        with self.lock:
+            depth = len(self.user_ids) + len(self.project_ids)
+            oldest_age = time.monotonic() - self.oldest if self.oldest is not None else 0.0
+        return {
+            "max_delay": self.max_delay,
+            "depth": depth,
+            "oldest_age": oldest_age,
+            "enqueued": self.enqueued,
+            "batches": self.batches,
+            "evicted_users": self.evicted_users,
+            "failed": self.failed,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+def cached(cache: UserIndexedTTLCache, key: Callable = cachetools.keys.hashkey,
+           flight: Optional[SingleFlight] = None,
+           refresher: Optional[CacheRefresher] = None):
+    """
+        cachetools.cached counterpart for UserIndexedTTLCache
+
+        Misses go through l2 and are computed once per key when flight is set,
+        hits close to expiry are refreshed in background when refresher is set
+    """
+    def decorator(func):
+        def compute(k, args, kwargs):
+            try:
+                with cache.lock:
+                    return cache[k]  # filled by a previous leader
+            except KeyError:
+                pass
+            try:
+                return cache.load_shared(k)
+            except KeyError:
+                pass
+            generation = cache.generation(k)
+            start = time.perf_counter()
+            value = func(*args, **kwargs)
+            cache.record_compute(time.perf_counter() - start)
+            cache.set_if_current(k, value, generation)
+            return value
+
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs)
+            try:
+                with cache.lock:
+                    value = cache[k]
+            except KeyError:
+                cache.record_lookup(False)
+            else:
+                cache.record_lookup(True)
+                if refresher is not None:
+                    refresher.maybe_refresh(cache, k, func, args, kwargs)
+                return value
+            if flight is None:
+                return compute(k, args, kwargs)
+            return flight.do(k, compute, k, args, kwargs)
+
+        return functools.update_wrapper(wrapper, func)
+    return decorator
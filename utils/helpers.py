@@ -1,11 +1,25 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Hashable
 
 from pylon.core.tools import log
 
 
 class ProjectCreationStep(ABC):
-    all_steps = []
+    """ One instance per create/delete run (see get_steps), so status belongs to that run """
+    # Context keys the step reads and the keys its create() result adds,
+    # steps run as soon as every step providing their requires is done
+    requires: tuple = ()
+    provides: tuple = ()
+    # Names of steps that must run first without passing data (e.g. roles before users)
+    after: tuple = ()
+    # Steps using the shared ORM session run alone, a Session is not thread safe
+    uses_session: bool = False
+    # Project plugins the step's resources serve, empty means every project needs them.
+    # Set per step name by the "step_plugins" config, e.g. {"influx_databases": ["backend_performance"]},
+    # once those plugins call projects_ensure_project_resources before first use
+    plugins: tuple = ()
 
     @property
     @abstractmethod
@@ -15,17 +29,12 @@ class ProjectCreationStep(ABC):
     def __eq__(self, other: 'ProjectCreationStep') -> bool:
         return self.name == other.name
 
-    def __new__(cls, *args, **kwargs):
-        klass = super().__new__(cls)
-        try:
-            index = ProjectCreationStep.all_steps.index(klass)
-            return ProjectCreationStep.all_steps[index]
-        except (ValueError, AttributeError):
-            ProjectCreationStep.all_steps.append(klass)
-            return klass
-
     def __init__(self, module=None):
         self.module = module
+        try:
+            self.plugins = tuple(module.descriptor.config.get('step_plugins', {}).get(self.name, self.plugins))
+        except AttributeError:
+            pass
         self._created = {
             'initialized': False,
             'ok': None,
@@ -39,16 +48,26 @@ class ProjectCreationStep(ABC):
             'step': self.name
         }
         #
-        if not hasattr(self, "_real_create"):
-            self._real_create = self.create
-            self.create = self.check_status('_created')(self._real_create)
+        self._real_create = self.create
+        self.create = self.check_status('_created')(self._real_create)
         #
-        if not hasattr(self, "_real_delete"):
-            self._real_delete = self.delete
-            self.delete = self.check_status('_deleted')(self._real_delete)
+        self._real_delete = self.delete
+        self.delete = self.check_status('_deleted')(self._real_delete)
         #
         log.info('Init step %s', self.name)
 
+    def serves(self, plugins) -> bool:
+        """ Step is needed by a project with these plugins """
+        return not self.plugins or bool(set(self.plugins) & set(plugins or ()))
+
+    def checkpoint(self, result: dict, **context) -> dict:
+        """ JSON data persisted once the step is done, secrets and clients are restored instead """
+        return {}
+
+    def restore(self, checkpoint: dict, **context) -> dict | None:
+        """ Context values the step provided, rebuilt from its checkpoint when a creation resumes """
+        return dict(checkpoint)
+
     @property
     def status(self) -> dict:
         return {
@@ -90,3 +109,25 @@ class ProjectCreationStep(ABC):
     @abstractmethod
     def delete(self, *args, **kwargs) -> Any:
         ...
+
+
+class KeyedLock:
+    """ Lock per key (e.g. user id), entries are dropped when nobody holds or waits for them """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.locks = {}  # key -> [RLock, users]
+
+    @contextmanager
+    def __call__(self, key: Hashable):
+        with self.lock:
+            entry = self.locks.setdefault(key, [threading.RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self.locks.pop(key, None)
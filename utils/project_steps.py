@@ -1,5 +1,8 @@
+import json
+import threading
 from datetime import datetime
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
 
 from pylon.core.tools import log
 from sqlalchemy import schema
@@ -8,31 +11,57 @@ from tools import db, VaultClient, auth, constants as c, MinioClient
 
 from . import get_project_user
 from .helpers import ProjectCreationStep
-from .rabbit_utils import password_generator, create_rabbit_user_and_vhost, \
+from .tenant_schema import create_tenant_schema
+from .rabbit_utils import AdminAPI, password_generator, create_rabbit_user_and_vhost, \
     delete_rabbit_user_and_vhost
 from ..constants import INFLUX_DATABASES, PROJECT_SCHEMA_TEMPLATE, PROJECT_USER_NAME_TEMPLATE, \
     PROJECT_USER_EMAIL_TEMPLATE, PROJECT_RABBIT_USER_TEMPLATE, PROJECT_RABBIT_VHOST_TEMPLATE
 from ..models.pd.project import ProjectCreatePD
 from ..models.project import Project
+from ..models.skipped_step import ProjectSkippedStep
+from ..models.checkpoint import ProjectStepCheckpoint
+from ..models.counter import ProjectCounter
+from ..models.warm_pool import ProjectWarmPool
 from ..models.quota import ProjectQuota
 from ..models.statistics import Statistic
 from ..tools.influx_tools import get_client
 
 
+class SharedClients:
+    """ External service clients reused by all projects of a batch, keyed by endpoint and credentials """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+
+    def get(self, key: tuple, factory: Callable):
+        with self.lock:
+            if key not in self.clients:
+                self.clients[key] = factory()
+            return self.clients[key]
+
+    def close(self) -> None:
+        with self.lock:
+            clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:  # pylint: disable=W0703
+                    log.warning('Failed to close %s: %s', client, e)
+
+
 class ProjectModel(ProjectCreationStep):
     name = 'project_model'
-
-    def create(self, project_model: ProjectCreatePD, owner_id: int, session, **kwargs) -> dict[str, Project]:
-        project = Project(
-            name=project_model.name,
-            plugins=project_model.plugins,
-            owner_id=owner_id
-        )
-        session.add(project)
-        session.commit()
-        log.info('after project.insert')
-        quota = ProjectQuota(
-            project_id=project.id,
+    requires = ('project_model', 'owner_id')
+    provides = ('project',)
+    uses_session = True
+
+    @staticmethod
+    def make_quota(project_model: ProjectCreatePD, project_id: int) -> ProjectQuota:
+        return ProjectQuota(
+            project_id=project_id,
             data_retention_limit=project_model.data_retention_limit,
             test_duration_limit=project_model.test_duration_limit,
             cpu_limit=project_model.cpu_limit,
@@ -44,20 +73,60 @@ class ProjectModel(ProjectCreationStep):
             storage_soft_limit=project_model.storage_soft_limit,
             storage_limit_total_block=project_model.storage_limit_total_block
         )
-        session.add(quota)
-        session.commit()
-        log.info('after quota created')
 
-        statistic = Statistic(
-            project_id=project.id,
+    @staticmethod
+    def make_statistic(project_id: int) -> Statistic:
+        return Statistic(
+            project_id=project_id,
             start_time=str(datetime.utcnow()),
         )
-        session.add(statistic)
+
+    @staticmethod
+    def is_counted(session, project: Project, warm_pool: bool = False) -> bool:
+        """ Pooled projects stay out of the tab counters until they are claimed """
+        return not warm_pool and session.get(ProjectWarmPool, project.id) is None
+
+    def create(self, project_model: ProjectCreatePD, owner_id: int, session,
+               project: Optional[Project] = None, warm_pool: bool = False, **kwargs) -> dict[str, Project]:
+        if project is not None:
+            # rows were inserted up front, e.g. by insert_projects
+            return {'project': project}
+        project = Project(
+            name=project_model.name,
+            plugins=project_model.plugins,
+            owner_id=owner_id
+        )
+        session.add(project)
+        session.flush()
+        if warm_pool:
+            # pooled in the project transaction, an interrupted refill leaves no visible, counted project
+            ProjectWarmPool.add(session, project.id)
+        if self.is_counted(session, project, warm_pool):
+            ProjectCounter.project_added(session, project.name)
+        session.commit()
+        log.info('after project.insert')
+        session.add(self.make_quota(project_model, project.id))
+        session.commit()
+        log.info('after quota created')
+
+        session.add(self.make_statistic(project.id))
         session.commit()
         log.info('after statistic created')
         return {'project': project}
 
-    def delete(self, project: Project, session, **kwargs) -> None:
+    def checkpoint(self, result: dict, project_model: ProjectCreatePD, owner_id: int, **context) -> dict:
+        # creation input, so a resumed run has what later steps read
+        return {'project_model': json.loads(project_model.json()), 'owner_id': owner_id}
+
+    def restore(self, checkpoint: dict, project: Project, **context) -> dict:
+        return {
+            'project': project,
+            'project_model': ProjectCreatePD.parse_obj(checkpoint['project_model']),
+            'owner_id': checkpoint['owner_id'],
+        }
+
+    def delete(self, project: Project, session, tombstone: bool = False,
+               warm_pool: bool = False, **kwargs) -> None:
         session.query(Statistic).filter(Statistic.project_id == project.id).delete()
         session.commit()
         log.info('statistic deleted')
@@ -67,13 +136,22 @@ class ProjectModel(ProjectCreationStep):
         log.info('quota deleted')
 
         # session.query(Project).where(Project.id == project.id).delete()
+        project_name = project.name
+        # tombstoned projects left the counters when deletion was requested
+        counted = not tombstone and self.is_counted(session, project, warm_pool)
         session.delete(project)
+        session.flush()
+        if counted:
+            ProjectCounter.project_removed(session, project_name)
         session.commit()
         log.info('project deleted')
 
 
 class MinioBuckets(ProjectCreationStep):
     name = 'minio_buckets'
+    requires = ('project',)
+    # bucket retention and secrets are read from the project's Vault space
+    after = ('project_secrets',)
 
     def create(self, project: Project, **kwargs) -> None:
         mc = MinioClient(project)
@@ -88,24 +166,28 @@ class MinioBuckets(ProjectCreationStep):
 
 class ProjectSchema(ProjectCreationStep):
     name = 'project_schema'
+    requires = ('project',)
 
     def create(self, project: Project, **kwargs) -> None:
         with db.with_project_schema_session(project.id) as tenant_db:
-            tenant_db.execute(schema.CreateSchema(PROJECT_SCHEMA_TEMPLATE.format(project.id)))
-            db.get_tenant_specific_metadata().create_all(bind=tenant_db.connection())
+            create_tenant_schema(
+                tenant_db.connection(), db.get_tenant_specific_metadata(),
+                PROJECT_SCHEMA_TEMPLATE.format(project.id),
+            )
             tenant_db.commit()
 
     def delete(self, project: Project, **kwargs) -> None:
-        try:
-            with db.with_project_schema_session(project.id) as tenant_db:
-                tenant_db.execute(schema.DropSchema(PROJECT_SCHEMA_TEMPLATE.format(project.id), cascade=True))
-                tenant_db.commit()
-        except Exception as e:
-            log.warning(f'Drop schema exception {e}')
+        # raises, so the project row is kept and the deletion retried instead of orphaning the schema
+        with db.with_project_schema_session(project.id) as tenant_db:
+            tenant_db.execute(
+                schema.DropSchema(PROJECT_SCHEMA_TEMPLATE.format(project.id), cascade=True, if_exists=True)
+            )
+            tenant_db.commit()
 
 
 class ProjectPermissions(ProjectCreationStep):
     name = 'project_permissions'
+    requires = ('project',)
 
     def create(self, project: Project, **kwargs) -> None:
         project_roles = auth.get_roles(mode='default')
@@ -117,12 +199,15 @@ class ProjectPermissions(ProjectCreationStep):
 
 class SystemUser(ProjectCreationStep):
     name = 'system_user'
+    requires = ('project',)
+    provides = ('system_user_id',)
+    after = ('project_permissions',)
 
     def create(self, project: Project, **kwargs) -> dict:
         # Auth: create project user
         try:
             user = get_project_user(project.id)
-            return user['id']
+            return {'system_user_id': user['id']}
         except (NoResultFound, RuntimeError):
             ...
         user_name = PROJECT_USER_NAME_TEMPLATE.format(project.id)
@@ -136,12 +221,17 @@ class SystemUser(ProjectCreationStep):
         )
         return {'system_user_id': user_id}
 
+    def checkpoint(self, result: dict, **context) -> dict:
+        return {'system_user_id': result['system_user_id']}
+
     def delete(self, system_user_id: int, **kwargs) -> None:
         auth.delete_user(system_user_id)
 
 
 class SystemToken(ProjectCreationStep):
     name = 'system_token'
+    requires = ('system_user_id',)
+    provides = ('system_token', 'system_token_id')
 
     def create(self, system_user_id: int, **kwargs) -> dict:
         # Auth: add project token
@@ -155,7 +245,15 @@ class SystemToken(ProjectCreationStep):
         else:
             token_id = all_tokens[0]["id"]
         #
-        return {'system_token': auth.encode_token(token_id)}
+        return {'system_token': auth.encode_token(token_id), 'system_token_id': token_id}
+
+    def checkpoint(self, result: dict, **context) -> dict:
+        # the token id is persisted, the token itself is encoded again on restore
+        return {'system_token_id': result['system_token_id']}
+
+    def restore(self, checkpoint: dict, **context) -> dict:
+        token_id = checkpoint['system_token_id']
+        return {'system_token': auth.encode_token(token_id), 'system_token_id': token_id}
 
     def delete(self, system_user_id: Optional[int] = None, **kwargs) -> None:
         if system_user_id:
@@ -165,6 +263,9 @@ class SystemToken(ProjectCreationStep):
 
 class ProjectSecrets(ProjectCreationStep):
     name = 'project_secrets'
+    requires = ('project', 'system_token')
+    provides = ('vault_client',)
+    uses_session = True
 
     def create(self, project: Project, system_token: str, session, **kwargs) -> dict[str, VaultClient]:
         vault_client = VaultClient.from_project(project)
@@ -191,18 +292,24 @@ class ProjectSecrets(ProjectCreationStep):
 
         return {'vault_client': VaultClient.from_project(project)}
 
+    def restore(self, checkpoint: dict, project: Project, **context) -> dict:
+        # project.secrets_json holds the Vault space, the client is built from it
+        return {'vault_client': VaultClient.from_project(project)}
+
     def delete(self, project: Project, **kwargs) -> None:
         VaultClient.from_project(project).remove_project_space()
 
 
 class RabbitVhost(ProjectCreationStep):
     name = 'rabbit_vhost'
+    requires = ('vault_client',)
 
-    def create(self, vault_client: VaultClient, **kwargs) -> None:
+    def create(self, vault_client: VaultClient, clients: Optional[SharedClients] = None, **kwargs) -> None:
         if c.ARBITER_RUNTIME != "rabbitmq":
             return
 
         all_secrets = vault_client.get_all_secrets()
+        rabbit_admin_auth = (all_secrets["rabbit_user"], all_secrets["rabbit_password"])
 
         # prepare user credentials
         user = PROJECT_RABBIT_USER_TEMPLATE.format(vault_client.project_id)
@@ -211,10 +318,14 @@ class RabbitVhost(ProjectCreationStep):
 
         create_rabbit_user_and_vhost(
             rabbit_admin_url=c.RABBIT_ADMIN_URL,
-            rabbit_admin_auth=(all_secrets["rabbit_user"], all_secrets["rabbit_password"]),
+            rabbit_admin_auth=rabbit_admin_auth,
             user=user,
             password=password,
-            vhost=vhost
+            vhost=vhost,
+            rabbit_client=clients.get(
+                ('rabbit', c.RABBIT_ADMIN_URL, rabbit_admin_auth),
+                lambda: AdminAPI(url=c.RABBIT_ADMIN_URL, auth=rabbit_admin_auth),
+            ) if clients is not None else None,
         )
 
         # set project secrets
@@ -239,13 +350,21 @@ class RabbitVhost(ProjectCreationStep):
 
 class InfluxDatabases(ProjectCreationStep):
     name = 'influx_databases'
+    requires = ('vault_client',)
 
-    def create(self, vault_client: VaultClient, **kwargs) -> None:
+    def create(self, vault_client: VaultClient, clients: Optional[SharedClients] = None, **kwargs) -> None:
         if not c.CENTRY_USE_INFLUX:
             return
         # vault_client = VaultClient.from_project(project_id)
         secrets = vault_client.get_all_secrets()
-        client = get_client(vault_client.project_id, secrets=secrets)
+        if clients is not None:
+            # influx host and credentials are global secrets, one client serves every project
+            client = clients.get(
+                ('influx', secrets.get("influx_ip"), secrets.get("influx_port"), secrets.get("influx_user")),
+                lambda: get_client(vault_client.project_id, secrets=secrets),
+            )
+        else:
+            client = get_client(vault_client.project_id, secrets=secrets)
         for i in INFLUX_DATABASES.keys():
             db_name = secrets.get(i)
             client.query(
@@ -265,6 +384,9 @@ class InfluxDatabases(ProjectCreationStep):
 
 class ProjectAdmin(ProjectCreationStep):
     name = 'project_admin'
+    requires = ('project_model', 'project', 'roles')
+    # last: its delete is a no-op, owners must not get access to a project that can still fail
+    after = ('project_schema', 'minio_buckets', 'rabbit_vhost', 'influx_databases')
 
     def create(self, project_model: ProjectCreatePD, project: Project, roles: list[str], **kwargs) -> None:
         emails = project_model.project_admin_email
@@ -342,29 +464,351 @@ class ProjectCreateError(Exception):
         self.rollback_progress = rollback_progress or []
 
 
-def create_project(module, context: dict, rollback_on_error: bool = True) -> list:
+def step_dependencies(steps: list, reverse: bool = False) -> dict[str, set]:
+    """ step name -> names of steps it waits for, reverse is the order for deletion """
+    names = {step.name for step in steps}
+    providers = {key: step.name for step in steps for key in step.provides}
+    deps = {step.name: set() for step in steps}
+    for step in steps:
+        for name in {providers[key] for key in step.requires if key in providers} | (set(step.after) & names):
+            if name == step.name:
+                continue
+            if reverse:
+                deps[name].add(step.name)
+            else:
+                deps[step.name].add(name)
+    return deps
+
+
+def run_steps(steps: list, call: Callable, on_result: Callable,
+              max_workers: int = 4, reverse: bool = False,
+              started: Optional[list] = None) -> list:
+    """
+        Run steps as a dependency graph on a bounded pool, returns started steps in start order
+        (also appended to started when given, so it is available after an error)
+
+        call(step) runs in a worker thread, uses_session steps run alone in the calling thread;
+        on_result(step, result) always runs in the calling thread. On the first error nothing
+        new is started, running steps are waited for and the error is raised
+    """
+    deps = step_dependencies(steps, reverse=reverse)
+    pending = list(steps)
+    done = set()
+    started = [] if started is None else started
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="project_steps") as pool:
+        while True:
+            progressed = False
+            for step in [i for i in pending if error is None and deps[i.name] <= done]:
+                if step.uses_session:
+                    if running:
+                        break
+                    pending.remove(step)
+                    started.append(step)
+                    progressed = True
+                    try:
+                        on_result(step, call(step))
+                        done.add(step.name)
+                    except Exception as e:  # pylint: disable=W0703
+                        error = e
+                    break
+                pending.remove(step)
+                started.append(step)
+                running[pool.submit(call, step)] = step
+                progressed = True
+            #
+            if not running:
+                if progressed and error is None:
+                    continue
+                break
+            #
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                try:
+                    on_result(step, future.result())
+                    done.add(step.name)
+                except Exception as e:  # pylint: disable=W0703
+                    if error is None:
+                        error = e
+    if error is not None:
+        raise error
+    if pending:
+        raise RuntimeError(f"Unresolved step dependencies: {[step.name for step in pending]}")
+    return started
+
+
+def get_steps_max_workers(module) -> int:
+    try:
+        return int(module.descriptor.config.get("project_steps_max_workers", 4))
+    except AttributeError:
+        return 4
+
+
+def get_bulk_max_workers(module) -> int:
+    try:
+        return int(module.descriptor.config.get("bulk_create_max_workers", 4))
+    except AttributeError:
+        return 4
+
+
+def create_project(module, context: dict, rollback_on_error: bool = True,
+                   on_progress: Optional[Callable[[list, list], None]] = None,
+                   session=None, completed: Iterable[str] = ()) -> list:
+    """
+        on_progress(progress, rollback_progress) is called after every finished step,
+        session is used instead of a new one, e.g. when context already holds a loaded project,
+        completed names steps already done whose results are restored in context (see resume_project)
+
+        Every finished step is checkpointed until the project is created
+    """
+    if session is None:
+        with db.with_project_schema_session(None) as session:
+            return create_project(module, context, rollback_on_error, on_progress, session, completed)
+    #
     progress = []
-    with db.with_project_schema_session(None) as session:
-        context['session'] = session
+    rollback_progress = []
+    context['session'] = session
+
+    def report():
+        if on_progress is None:
+            return
+        try:
+            on_progress(progress, rollback_progress)
+        except Exception:  # pylint: disable=W0703
+            log.exception('create_project progress report')
+
+    def call(step):
+        return step.create(**context)
+
+    def save_checkpoint(step, step_result):
+        try:
+            data = step.checkpoint(step_result if isinstance(step_result, dict) else {}, **context)
+            # own session: checkpoints outlive a rollback of the creation session
+            with db.with_project_schema_session(None) as checkpoint_session:
+                ProjectStepCheckpoint.save(checkpoint_session, context['project'].id, step.name, data)
+                checkpoint_session.commit()
+        except Exception:  # pylint: disable=W0703
+            if step.name == ProjectModel.name:
+                raise  # resume_project starts from this one
+            log.exception('create_project checkpoint %s', step.name)
+
+    def on_result(step, step_result):
+        if step_result is not None:
+            if isinstance(step_result, dict):
+                context.update(step_result)
+            else:
+                context[step.name] = step_result
+        if step.uses_session and 'project' in context:
+            # commits expire the project, load it here before workers read it
+            session.refresh(context['project'])
+        if 'project' in context:
+            save_checkpoint(step, step_result)
+        report()
+
+    steps = list(get_steps(module))
+    plugins = context['project_model'].plugins
+    skipped = [step.name for step in steps if not step.serves(plugins)]
+    completed = set(completed)
+    try:
+        run_steps(
+            [step for step in steps if step.serves(plugins) and step.name not in completed],
+            call, on_result,
+            max_workers=get_steps_max_workers(module), started=progress,
+        )
+    except Exception as e:
+        log.exception('create_project')
+        session.rollback()
+        report()
+        if rollback_on_error:
+            for step in reversed(progress):
+                step.delete(**context)
+                rollback_progress.append(step)
+                report()
+        raise ProjectCreateError(progress, rollback_progress)
+    context['project'].create_success = True
+    ProjectSkippedStep.add(session, context['project'].id, skipped)
+    ProjectStepCheckpoint.clear(session, context['project'].id)
+    session.commit()
+    module.context.event_manager.fire_event('project_created', context['project'].to_json())
+    return progress
+
+
+def resume_project(module, project_id: int, roles: list[str],
+                   on_progress: Optional[Callable[[list, list], None]] = None,
+                   session=None) -> Optional[list]:
+    """
+        Finish a failed creation: steps with a checkpoint are restored instead of run again,
+        the rest runs without rollback; None when there is no checkpoint to resume from
+    """
+    if session is None:
+        with db.with_project_schema_session(None) as session:
+            return resume_project(module, project_id, roles, on_progress, session)
+    #
+    project = session.get(Project, project_id)
+    checkpoints = ProjectStepCheckpoint.get(session, project_id) if project is not None else {}
+    if ProjectModel.name not in checkpoints:
+        return None
+    context = {'project': project, 'roles': roles, 'session': session}
+    # get_steps lists providers before their consumers, so every restore sees what it reads
+    for step in get_steps(module):
+        if step.name in checkpoints:
+            context.update(step.restore(checkpoints[step.name], **context) or {})
+    log.info('Resuming project %s creation after %s', project_id, sorted(checkpoints))
+    return create_project(
+        module, context, rollback_on_error=False, on_progress=on_progress,
+        session=session, completed=checkpoints,
+    )
+
+
+def project_delete_context(session, project: Project) -> dict:
+    try:
+        system_user_id = get_project_user(project.id)['id']
+    except (RuntimeError, KeyError, NoResultFound):
+        system_user_id = None
+    return {
+        'project': project,
+        'vault_client': VaultClient.from_project(project),
+        'system_user_id': system_user_id,
+        'session': session
+    }
+
+
+def delete_project_steps(module, context: dict, exclude: Iterable[str] = (),
+                         on_progress: Optional[Callable[[list], None]] = None) -> list[dict]:
+    """
+        Run delete of every step (except exclude names) in reverse dependency order,
+        failures are logged and skipped; on_progress(statuses) is called after every step
+    """
+    session = context['session']
+    skipped = ProjectSkippedStep.get(session, context['project'].id) | set(exclude)
+    progress = []
+
+    def on_result(step, step_result):
+        if on_progress is not None:
+            on_progress([i.status['deleted'] for i in progress])
+
+    def call(step):
         try:
-            for step in get_steps(module):
-                progress.append(step)
-                step_result = step.create(**context)
-                if step_result is not None:
-                    if isinstance(step_result, dict):
-                        context.update(step_result)
-                    else:
-                        context[step.name] = step_result
-        except Exception as e:
-            log.exception('create_project')
+            step.delete(**context)
+            if step.uses_session:
+                session.commit()
+        except Exception as e:  # pylint: disable=W0703
+            log.warning('step exc %s %s', repr(step), e)
+
+    run_steps(
+        [step for step in get_steps(module, reverse=True) if step.name not in skipped],
+        call, on_result,
+        max_workers=get_steps_max_workers(module), reverse=True, started=progress,
+    )
+    return [step.status['deleted'] for step in progress]
+
+
+def provision_skipped_steps(module, project_id: int, plugins: Optional[list] = None) -> list[dict]:
+    """
+        Create resources skipped at project creation that the project plugins (or the given
+        plugins, e.g. one about to be used) need now; returns step statuses, empty when
+        there is nothing to do. Concurrent calls for a project wait for each other
+    """
+    with db.with_project_schema_session(None) as session:
+        project = session.get(Project, project_id)
+        if project is None:
+            raise NoResultFound(f'Project {project_id} not found')
+        skipped = ProjectSkippedStep.get(session, project_id, for_update=True)
+        if plugins is None:
+            plugins = project.plugins
+        steps = [step for step in get_steps(module) if step.name in skipped and step.serves(plugins)]
+        if not steps:
             session.rollback()
-            rollback_progress = []
-            if rollback_on_error:
-                for step in reversed(progress):
-                    step.delete(**context)
-                    rollback_progress.append(step)
-            raise ProjectCreateError(progress, rollback_progress)
-        context['project'].create_success = True
+            return []
+        context = {
+            'project': project,
+            'vault_client': VaultClient.from_project(project),
+            'session': session,
+        }
+
+        def on_result(step, step_result):
+            if isinstance(step_result, dict):
+                context.update(step_result)
+
+        progress = []
+        try:
+            run_steps(
+                steps, lambda step: step.create(**context), on_result,
+                max_workers=get_steps_max_workers(module), started=progress,
+            )
+        except Exception:  # pylint: disable=W0703
+            log.exception('provision_skipped_steps')
+            # finished ones are not skipped anymore, the rest is retried on next call
+            done = [step.name for step in progress if step.status['created']['ok']]
+            if done:
+                ProjectSkippedStep.remove(session, project_id, done)
+            session.commit()
+            raise ProjectCreateError(progress, [])
+        ProjectSkippedStep.remove(session, project_id, [step.name for step in steps])
         session.commit()
-        module.context.event_manager.fire_event('project_created', context['project'].to_json())
-    return progress
+    return [step.status['created'] for step in progress]
+
+
+def insert_projects(session, project_models: list[ProjectCreatePD], owner_id: int) -> list[int]:
+    """ Project, quota and statistic rows of a batch in three batched inserts and one commit """
+    projects = [
+        Project(name=project_model.name, plugins=project_model.plugins, owner_id=owner_id)
+        for project_model in project_models
+    ]
+    session.add_all(projects)
+    session.flush()
+    session.add_all([
+        ProjectModel.make_quota(project_model, project.id)
+        for project_model, project in zip(project_models, projects)
+    ])
+    session.add_all([ProjectModel.make_statistic(project.id) for project in projects])
+    ProjectCounter.projects_added(session, [project.name for project in projects])
+    session.commit()
+    return [project.id for project in projects]
+
+
+def create_projects_bulk(module, project_models: list[ProjectCreatePD], owner_id: int,
+                         roles: list[str], rollback_on_error: bool = True) -> list[dict]:
+    """
+        Provision many projects: rows are inserted in one batch, then the remaining steps
+        run per project, several projects at a time, with shared external clients;
+        returns per project step statuses
+    """
+    with db.with_project_schema_session(None) as session:
+        project_ids = insert_projects(session, project_models, owner_id)
+    #
+    clients = SharedClients()
+
+    def provision(project_model: ProjectCreatePD, project_id: int) -> dict:
+        result = {'name': project_model.name, 'project_id': project_id}
+        with db.with_project_schema_session(None) as session:
+            context = {
+                'project_model': project_model,
+                'owner_id': owner_id,
+                'roles': roles,
+                'project': session.get(Project, project_id),
+                'clients': clients,
+            }
+            try:
+                progress = create_project(
+                    module, context, rollback_on_error=rollback_on_error, session=session,
+                )
+                result.update(ok=True, steps=[step.status['created'] for step in progress], rollback_steps=[])
+            except ProjectCreateError as e:
+                result.update(
+                    ok=False,
+                    project_id=None if e.rollback_progress else project_id,
+                    steps=[step.status['created'] for step in e.progress],
+                    rollback_steps=[step.status['deleted'] for step in e.rollback_progress],
+                )
+        return result
+
+    try:
+        with ThreadPoolExecutor(
+                max_workers=get_bulk_max_workers(module), thread_name_prefix="project_bulk"
+        ) as pool:
+            return list(pool.map(provision, project_models, project_ids))
+    finally:
+        clients.close()
@@ -11,7 +11,7 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
-from typing import Tuple
+from typing import Optional, Tuple
 
 from ..constants import PROJECT_RABBIT_USER_TEMPLATE, PROJECT_RABBIT_VHOST_TEMPLATE
 from rabbitmq_admin import AdminAPI
@@ -41,12 +41,14 @@ def password_generator(length=16):
 
 
 def create_rabbit_user_and_vhost(rabbit_admin_url: str, rabbit_admin_auth: Tuple[str, str],
-                                 user: str, password: str, vhost: str) -> None:
+                                 user: str, password: str, vhost: str,
+                                 rabbit_client: Optional[AdminAPI] = None) -> None:
     if c.ARBITER_RUNTIME != "rabbitmq":
         return
 
-    # connect to RabbitMQ management api
-    rabbit_client = AdminAPI(url=rabbit_admin_url, auth=rabbit_admin_auth)
+    # connect to RabbitMQ management api, unless a client is shared by the caller
+    if rabbit_client is None:
+        rabbit_client = AdminAPI(url=rabbit_admin_url, auth=rabbit_admin_auth)
 
     # create project user and vhost
     rabbit_client.create_vhost(vhost)
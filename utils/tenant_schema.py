@@ -0,0 +1,122 @@
+#   Copyright 2025 EPAM Systems
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+""" Tenant schema DDL compiled once per metadata shape """
+
+import hashlib
+import re
+import threading
+from typing import Optional
+
+from sqlalchemy import Enum, MetaData
+from sqlalchemy.schema import CreateIndex, CreateSchema, CreateTable, SetColumnComment, SetTableComment
+
+from pylon.core.tools import log  # pylint: disable=E0611,E0401
+
+# Rendered in place of tenant table schemas, replaced by p_{id} per project
+SCHEMA_PLACEHOLDER = "tenant_schema_placeholder"
+_PLACEHOLDER_RE = re.compile(rf"\b{SCHEMA_PLACEHOLDER}\b")
+
+_lock = threading.Lock()
+_scripts = {}  # (dialect, fingerprint) -> script or None when create_all is needed
+
+
+def metadata_fingerprint(metadata: MetaData) -> str:
+    """ Changes whenever a plugin adds or alters a tenant table """
+    shape = []
+    for table in metadata.sorted_tables:
+        shape.append((
+            table.schema, table.name,
+            tuple((column.name, repr(column.type), column.nullable) for column in table.columns),
+            tuple(sorted(
+                (type(constraint).__name__, constraint.name or "", tuple(constraint.columns.keys()))
+                for constraint in table.constraints
+            )),
+            tuple(sorted(index.name or "" for index in table.indexes)),
+        ))
+    shape.append(tuple(sorted(metadata._sequences)))  # pylint: disable=W0212
+    return hashlib.sha1(repr(shape).encode()).hexdigest()
+
+
+def _listener_owner(listener):
+    func = getattr(listener, "func", listener)  # functools.partial in SQLAlchemy 2.1
+    return getattr(func, "__self__", None) or getattr(listener, "target", None)
+
+
+def _native_enums(metadata: MetaData) -> Optional[list]:
+    """
+        Enum types to create ahead of tables, None when some table or the metadata
+        has create listeners other than Enum's, their DDL can only come from create_all
+    """
+    listeners = [*metadata.dispatch.before_create, *metadata.dispatch.after_create]
+    for table in metadata.tables.values():
+        listeners.extend([*table.dispatch.before_create, *table.dispatch.after_create])
+    enums = {}
+    for listener in listeners:
+        owner = _listener_owner(listener)
+        if not isinstance(owner, Enum):
+            return None
+        if owner.native_enum and getattr(owner, "create_type", True):
+            enums.setdefault((owner.schema, owner.name), owner)
+    return list(enums.values())
+
+
+def compile_tenant_script(metadata: MetaData, dialect) -> Optional[str]:
+    """ CREATE TYPE / TABLE / INDEX / COMMENT statements of metadata as one script """
+    if metadata._sequences:  # pylint: disable=W0212
+        # standalone sequences are only created by create_all
+        return None
+    enums = _native_enums(metadata)
+    if enums is None:
+        return None
+    from sqlalchemy.dialects.postgresql.named_types import CreateEnumType  # pylint: disable=C0415
+    #
+    schemas = {table.schema for table in metadata.tables.values()} | {enum.schema for enum in enums}
+    compile_kwargs = {
+        "dialect": dialect,
+        "schema_translate_map": {schema: SCHEMA_PLACEHOLDER for schema in schemas},
+        "render_schema_translate": True,
+    }
+    statements = [CreateEnumType(enum) for enum in enums]
+    for table in metadata.sorted_tables:
+        statements.append(CreateTable(table))
+        statements.extend(CreateIndex(index) for index in sorted(table.indexes, key=lambda i: i.name or ""))
+        if table.comment:
+            statements.append(SetTableComment(table))
+        statements.extend(SetColumnComment(column) for column in table.columns if column.comment)
+    # percents stay doubled for format paramstyles, exec_driver_sql still formats the script
+    return ";\n".join(str(statement.compile(**compile_kwargs)).strip() for statement in statements) + ";"
+
+
+def get_tenant_script(metadata: MetaData, dialect) -> Optional[str]:
+    key = (dialect.name, metadata_fingerprint(metadata))
+    with _lock:
+        if key not in _scripts:
+            _scripts[key] = compile_tenant_script(metadata, dialect)
+            if _scripts[key] is None:
+                log.info("Tenant metadata has custom create listeners or sequences, using create_all")
+        return _scripts[key]
+
+
+def create_tenant_schema(connection, metadata: MetaData, schema_name: str) -> None:
+    """ Schema and all tenant tables in one round trip, create_all when the script is not usable """
+    script = get_tenant_script(metadata, connection.dialect)
+    if script is None:
+        connection.execute(CreateSchema(schema_name))
+        metadata.create_all(bind=connection)
+        return
+    create_schema = str(CreateSchema(schema_name).compile(dialect=connection.dialect))
+    connection.exec_driver_sql(
+        f"{create_schema};\n" + _PLACEHOLDER_RE.sub(schema_name, script)
+    )